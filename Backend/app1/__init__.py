@@ -1,11 +1,7 @@
-from flask import Flask
-from flask_cors import CORS
+import os
+import sys
 
-app = Flask(__name__)
-CORS(app)
+# Modules in app1/ import each other by bare name, as when running app1/app.py directly
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Import routes only after app is created to avoid circular imports
-from . import pred_bot
-
-# Register routes with the Flask app
-# app.register_blueprint(routes.bp)
\ No newline at end of file
+from app import create_app  # noqa: E402
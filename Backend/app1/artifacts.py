@@ -0,0 +1,200 @@
+"""Build and load prebuilt model artifacts.
+
+    python app1/artifacts.py [--out DIR]
+
+The training data is stored as .npy arrays: the symptom matrix as uint8
+(0/1), labels as int16 codes, the symptom and disease names, and which
+symptoms each disease ever shows, plus a SHA-256 of the Training.csv they came
+from. Artifacts built from a different Training.csv are ignored. They are
+memory-mapped read-only, so gunicorn workers forked from a preloaded master
+share the same pages instead of each holding its own DataFrame.
+
+The disease model is a random forest wrapped in CalibratedClassifierCV, so one
+predict_proba call gives calibrated probabilities for every disease. Building
+it takes a few seconds, which is why images build it once instead of every
+worker training it at startup. The sklearn version, Training.csv hash and
+labels it was built with are kept in source.json and checked before the
+pickle is loaded, since unpickling one built elsewhere is itself the risk.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import NamedTuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+
+from config import ARTIFACT_DIR
+
+logger = logging.getLogger(__name__)
+
+DISEASE_MODEL_FILE = 'disease_model.joblib'
+SYMPTOMS_FILE = 'symptoms.npy'
+LABELS_FILE = 'labels.npy'
+FEATURES_FILE = 'features.npy'
+CLASSES_FILE = 'classes.npy'
+DISEASE_SYMPTOMS_FILE = 'disease_symptoms.npy'
+SOURCE_FILE = 'source.json'
+TRAINING_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data', 'Training.csv')
+
+
+class TrainingData(NamedTuple):
+    X: np.ndarray         # (rows, symptoms) uint8, 1 where the symptom is present
+    y: np.ndarray         # label codes, indexes into classes
+    features: list        # symptom column names
+    classes: np.ndarray   # disease names, sorted as LabelEncoder sorts them
+    disease_symptoms: np.ndarray  # (diseases, symptoms) uint8, 1 if any row of that disease has the symptom
+
+
+def disease_symptom_matrix(X, y, n_classes):
+    matrix = np.zeros((n_classes, X.shape[1]), dtype=np.uint8)
+    np.maximum.at(matrix, y, X)
+    return matrix
+
+
+@functools.lru_cache(maxsize=None)
+def training_csv_hash(path=TRAINING_CSV):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_source(artifact_dir):
+    """Metadata in source.json, or {} if it is missing or unreadable."""
+    try:
+        with open(os.path.join(artifact_dir, SOURCE_FILE)) as f:
+            source = json.load(f)
+        return source if isinstance(source, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_source(artifact_dir, source):
+    tmp_path = os.path.join(artifact_dir, SOURCE_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(source, f, indent=1)
+    os.replace(tmp_path, os.path.join(artifact_dir, SOURCE_FILE))
+
+
+def read_training_csv(path=TRAINING_CSV):
+    training = pd.read_csv(path)
+    # pandas suffixes repeated headers (fluid-overload.1), keep those names as the model's features
+    features = [str(c) for c in training.columns[:-1]]
+    classes, y = np.unique(training['prognosis'].to_numpy(dtype=str), return_inverse=True)
+    X = training[features].to_numpy(dtype=np.uint8)
+    return TrainingData(X, y.astype(np.int16), features, classes, disease_symptom_matrix(X, y, len(classes)))
+
+
+def build_training_data(out_dir=ARTIFACT_DIR):
+    data = read_training_csv()
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, SYMPTOMS_FILE), data.X)
+    np.save(os.path.join(out_dir, LABELS_FILE), data.y)
+    np.save(os.path.join(out_dir, FEATURES_FILE), np.array(data.features))
+    np.save(os.path.join(out_dir, CLASSES_FILE), data.classes)
+    np.save(os.path.join(out_dir, DISEASE_SYMPTOMS_FILE), data.disease_symptoms)
+    # Written last, so an interrupted build leaves artifacts that don't match any CSV.
+    # Any disease model metadata is dropped until build_disease_model runs again.
+    _write_source(out_dir, {'training_csv_sha256': training_csv_hash()})
+    return data
+
+
+def load_training_data(artifact_dir=ARTIFACT_DIR):
+    """Memory-map the prebuilt training arrays, or parse Training.csv if they are missing or stale."""
+    if _read_source(artifact_dir).get('training_csv_sha256') != training_csv_hash():
+        if os.path.exists(os.path.join(artifact_dir, SYMPTOMS_FILE)):
+            logger.warning("Ignoring training data artifacts in %s: built from a different %s, "
+                           "re-run app1/artifacts.py", artifact_dir, TRAINING_CSV)
+        else:
+            logger.info("No training data artifacts in %s, reading %s", artifact_dir, TRAINING_CSV)
+        return read_training_csv()
+    try:
+        return TrainingData(
+            np.load(os.path.join(artifact_dir, SYMPTOMS_FILE), mmap_mode='r'),
+            np.load(os.path.join(artifact_dir, LABELS_FILE), mmap_mode='r'),
+            [str(f) for f in np.load(os.path.join(artifact_dir, FEATURES_FILE))],
+            np.load(os.path.join(artifact_dir, CLASSES_FILE)),
+            np.load(os.path.join(artifact_dir, DISEASE_SYMPTOMS_FILE)),
+        )
+    except FileNotFoundError:
+        logger.info("No training data artifacts in %s, reading %s", artifact_dir, TRAINING_CSV)
+        return read_training_csv()
+
+
+def train_disease_model(X, y):
+    """Fit the calibrated ensemble on a binary symptom matrix and encoded labels."""
+    forest = RandomForestClassifier(n_estimators=100, random_state=0)
+    model = CalibratedClassifierCV(forest, method='sigmoid', cv=5, ensemble=False)
+    return model.fit(X, y)
+
+
+def build_disease_model(data, out_dir=ARTIFACT_DIR):
+    model = train_disease_model(data.X, data.y)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, DISEASE_MODEL_FILE)
+    joblib.dump(model, path)
+    # load_disease_model checks this before unpickling anything
+    source = _read_source(out_dir)
+    source['disease_model'] = {
+        'sklearn_version': sklearn.__version__,
+        'training_csv_sha256': training_csv_hash(),
+        'features': list(data.features),
+        'classes': [str(c) for c in data.classes],
+    }
+    _write_source(out_dir, source)
+    return path
+
+
+def load_disease_model(features, classes, artifact_dir=ARTIFACT_DIR):
+    """Return the prebuilt disease model, or None if it is missing or doesn't fit this code.
+
+    The artifact is only used when source.json says it was built with the running
+    sklearn version, from the current Training.csv, and for the same symptom
+    columns and disease labels. Those checks run before the pickle is loaded.
+    """
+    path = os.path.join(artifact_dir, DISEASE_MODEL_FILE)
+    if not os.path.exists(path):
+        return None
+    meta = _read_source(artifact_dir).get('disease_model')
+    if not isinstance(meta, dict):
+        logger.warning("Ignoring %s: no build metadata in %s", path, SOURCE_FILE)
+        return None
+    if meta.get('sklearn_version') != sklearn.__version__:
+        logger.warning("Ignoring %s: built with sklearn %s, running %s",
+                       path, meta.get('sklearn_version'), sklearn.__version__)
+        return None
+    if meta.get('training_csv_sha256') != training_csv_hash():
+        logger.warning("Ignoring %s: built from a different %s", path, TRAINING_CSV)
+        return None
+    if meta.get('features') != list(features) or meta.get('classes') != [str(c) for c in classes]:
+        logger.warning("Ignoring %s: built from different training data", path)
+        return None
+    try:
+        return joblib.load(path)
+    except Exception as e:
+        logger.warning("Could not load %s: %s", path, e)
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=ARTIFACT_DIR, help='directory to write artifacts to')
+    args = parser.parse_args(argv)
+    data = build_training_data(args.out)
+    print(f"Wrote training data ({data.X.shape[0]} rows x {data.X.shape[1]} symptoms) to {args.out}")
+    print(f"Wrote {build_disease_model(data, args.out)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
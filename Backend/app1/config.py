@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+# Upstream LLM services
+MIXTRAL_API_URL = os.environ.get('MIXTRAL_API_URL', "https://api.mistral.ai/v1/chat/completions")
+MIXTRAL_API_KEY = os.environ.get('MIXTRAL_API_KEY', "your_API_key")
+MIXTRAL_API_KEY1 = os.environ.get('MIXTRAL_API_KEY1', "your_API_key")
+GEMINI_API_URL = os.environ.get(
+    'GEMINI_API_URL',
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent")
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', "your_API_key")
+
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Prescription images sent to Gemini are downscaled to this long edge and re-encoded
+PRESCRIPTION_MAX_EDGE = int(os.environ.get('PRESCRIPTION_MAX_EDGE', 2048))
+PRESCRIPTION_IMAGE_FORMAT = os.environ.get('PRESCRIPTION_IMAGE_FORMAT', 'JPEG').upper()  # JPEG or WEBP
+PRESCRIPTION_IMAGE_QUALITY = int(os.environ.get('PRESCRIPTION_IMAGE_QUALITY', 85))
+
+# OCR engine for lab reports: 'pytesseract' spawns tesseract per image, 'tesserocr'
+# keeps a pool of worker processes with the language model already loaded
+OCR_BACKEND = os.environ.get('OCR_BACKEND', 'pytesseract').lower()
+# tesserocr processes per server process. Every gunicorn worker starts its own pool, so
+# gunicorn.conf.py defaults this to cpu_count // workers to keep the total near one per CPU.
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', os.cpu_count() or 1))
+OCR_LANG = os.environ.get('OCR_LANG', 'eng')
+# PDF pages whose embedded text layer has at least this many letters/digits skip OCR
+PDF_TEXT_MIN_CHARS = int(os.environ.get('PDF_TEXT_MIN_CHARS', 20))
+
+# Per-request profiling: when enabled, requests sent with an X-Profile: 1 header are
+# profiled and the result is written to PROFILE_DIR named after the request id
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+PROFILER = os.environ.get('PROFILER', 'cprofile').lower()  # cprofile or pyinstrument
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'docconnect-profiles'))
+
+# Logging: root level, per-logger overrides as "name=LEVEL,name=LEVEL", output format
+# (json or text), optional file, message/argument truncation and DEBUG sampling
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = dict(
+    (name.strip(), level.strip().upper())
+    for name, _, level in (item.partition('=') for item in os.environ.get('LOG_LEVELS', '').split(','))
+    if name.strip() and level.strip()
+)
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json').lower()
+LOG_FILE = os.environ.get('LOG_FILE', '')
+LOG_MAX_MESSAGE_CHARS = int(os.environ.get('LOG_MAX_MESSAGE_CHARS', 2000))
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))
+
+# Most symptom sets accepted by one /predict-disease/batch request
+PREDICT_BATCH_MAX_ITEMS = int(os.environ.get('PREDICT_BATCH_MAX_ITEMS', 500))
+
+# Prebuilt model files (python app1/artifacts.py); the disease model is trained at
+# startup instead when they are missing or were built for another sklearn version
+ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts'))
+# Ranked diseases returned as a differential, and the probability below which they are dropped
+DIFFERENTIAL_TOP_K = int(os.environ.get('DIFFERENTIAL_TOP_K', 3))
+DIFFERENTIAL_MIN_PROBABILITY = float(os.environ.get('DIFFERENTIAL_MIN_PROBABILITY', 0.01))
+
+# Server-side /assistant sessions, used when a client sends session_id (or "session": true)
+# instead of round-tripping the context. 'memory' is an LRU per worker process, so with
+# several gunicorn workers use 'sqlite' (shared file on one host) or 'redis';
+# gunicorn.conf.py defaults to 'sqlite' when it starts more than one worker.
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'memory').lower()  # memory, sqlite or redis
+SESSION_TTL = int(os.environ.get('SESSION_TTL', 30 * 60))  # seconds since the last turn
+SESSION_MAX_ENTRIES = int(os.environ.get('SESSION_MAX_ENTRIES', 10000))
+SESSION_SQLITE_PATH = os.environ.get(
+    'SESSION_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'docconnect-sessions.sqlite3'))
+SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+
+# Health tips: answers pre-generated per (age range, gender, goal) by `python app1/health_tips.py`,
+# plus an in-process cache for the goal combinations the file doesn't cover
+HEALTH_TIPS_PATH = os.environ.get(
+    'HEALTH_TIPS_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data', 'health_tips.json'))
+HEALTH_TIPS_CACHE_SIZE = int(os.environ.get('HEALTH_TIPS_CACHE_SIZE', 1024))
+HEALTH_TIPS_CACHE_TTL = int(os.environ.get('HEALTH_TIPS_CACHE_TTL', 24 * 60 * 60))
+
+# Semantic cache for /assistant follow-up answers: a new question reuses a stored answer
+# when the cosine similarity of their hashed bag-of-words vectors reaches the threshold
+SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', 0.9))
+SEMANTIC_CACHE_SIZE = int(os.environ.get('SEMANTIC_CACHE_SIZE', 1024))
+SEMANTIC_CACHE_TTL = int(os.environ.get('SEMANTIC_CACHE_TTL', 24 * 60 * 60))
+SEMANTIC_CACHE_FEATURES = int(os.environ.get('SEMANTIC_CACHE_FEATURES', 4096))
@@ -0,0 +1,61 @@
+"""Pre-serialized JSON for the static part of a diagnosis.
+
+Description, precautions and doctor recommendations depend only on the
+disease, and there are a few dozen diseases. The JSON for those members is
+encoded once per disease at startup. A response is then the prediction
+(disease, differential, severity, ...) encoded as usual with that fragment
+spliced in before the closing brace.
+"""
+import json
+import threading
+
+from flask import Response
+
+from model import description_list, get_doctor_recommendations, le, precautionDictionary
+from vocabulary import normalize_disease
+
+
+def dumps(value):
+    # Same output as jsonify outside debug mode, except that NaN and Infinity raise
+    # instead of producing a body JSON.parse rejects
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, allow_nan=False).encode()
+
+
+def _fragment(disease):
+    static = {
+        "description": description_list.get(disease, "No description available."),
+        "precautions": precautionDictionary.get(disease, ["No precautions available."]),
+        "doctor_recommendations": get_doctor_recommendations(disease),
+    }
+    return dumps(static)[1:-1]  # members only, without the braces
+
+
+class DiseaseFragments:
+    def __init__(self, diseases):
+        self._fragments = {normalize_disease(d): _fragment(d) for d in diseases}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def get(self, disease):
+        key = normalize_disease(disease)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            # Not one of the model's classes; encode it once and keep it
+            fragment = _fragment(disease)
+            with self._lock:
+                self._fragments.setdefault(key, fragment)
+        return fragment
+
+    def encode(self, prediction):
+        """JSON bytes for a prediction dict plus the static members for its "disease"."""
+        return dumps(prediction)[:-1] + b',' + self.get(prediction["disease"]) + b'}'
+
+
+fragments = DiseaseFragments(le.classes_)
+
+
+def json_response(body, status=200):
+    # jsonify ends its body with a newline too
+    return Response(body + b'\n', status=status, mimetype='application/json')
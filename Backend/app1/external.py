@@ -1,220 +1,167 @@
-# from flask import Flask, request, jsonify
-# from flask_cors import CORS
-# import numpy as np
-# import cv2
-# from PIL import Image
-# import pytesseract
-# import logging
-# from external import extract_medications_gemini
-# import io
-# import re
-# import pandas as pd
-# from fuzzywuzzy import fuzz
+import json
+import logging
+import re
 
-# # Set the Tesseract path
-# pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
+import requests
 
-# app = Flask(__name__)
-# CORS(app)
+from metrics import upstream_call
+from config import MIXTRAL_API_URL, MIXTRAL_API_KEY, MIXTRAL_API_KEY1, GEMINI_API_URL, GEMINI_API_KEY
+from uploads import iter_json_with_inline_data, inline_data_placeholder
 
-# # Load medicine dataset
-# try:
-#     MEDICINE_DB = pd.read_csv('Backend/app1/Data/Medicine_Details.csv')
-#     logging.info("Successfully loaded medicine dataset")
-# except Exception as e:
-#     logging.error(f"Failed to load medicine dataset: {e}")
-#     MEDICINE_DB = pd.DataFrame()
+logger = logging.getLogger(__name__)
 
-# def preprocess_image(img_np):
-#     """Enhance image quality for better OCR results with Tesseract"""
-#     if len(img_np.shape) == 3:
-#         gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
-#     else:
-#         gray = img_np
-    
-#     # Step 1: Increase contrast using CLAHE with adjusted parameters
-#     clahe = cv2.createCLAHE(clipLimit=4.0, tileGridSize=(16, 16))  # Higher clipLimit and larger tileGridSize
-#     gray = clahe.apply(gray)
+# Returned by query_mixtral instead of raising, so callers can tell it apart from an answer
+UPSTREAM_ERROR_MESSAGE = "Sorry, there was an issue connecting to the medical assistant service. Please try again later."
 
-#     # Step 2: Denoise with a stronger Gaussian blur
-#     gray = cv2.GaussianBlur(gray, (5, 5), 0)
+BASE_PROMPT_FOLLOW_UP = (
+    "You're a certified medical assistant. Based on the user's query, give clear, medically accurate, "
+    "and easy-to-understand advice. Never diagnose or prescribe medication. Recommend seeing a doctor for serious concerns."
+)
+BASE_PROMPT_HEALTH_TIPS = (
+    "You're a certified health advisor. Provide clear, practical, and safe personalized health tips "
+    "based on the user's age, gender, and health goals. Avoid medical diagnoses or prescriptions. "
+    "Suggest consulting a doctor for serious concerns."
+)
 
-#     # Step 3: Apply binary thresholding with Otsu's method
-#     _, gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-#     # Step 4: Apply dilation and erosion to remove noise
-#     kernel = np.ones((3, 3), np.uint8)
-#     gray = cv2.dilate(gray, kernel, iterations=1)
-#     gray = cv2.erode(gray, kernel, iterations=1)
-    
-#     # Save the preprocessed image for debugging
-#     cv2.imwrite("processed_img.jpg", gray)
-    
-#     return gray
+# Mistral chat completions, used by the assistant and report analysis
+def query_mixtral(user_query, prompt_type="follow_up"):
+    try:
+        headers = {
+            "Authorization": f"Bearer {MIXTRAL_API_KEY}",
+            "Content-Type": "application/json"
+        }
+        base_prompt = BASE_PROMPT_FOLLOW_UP if prompt_type == "follow_up" else BASE_PROMPT_HEALTH_TIPS
+        payload = {
+            "model": "mistral-small",
+            "messages": [
+                {"role": "system", "content": base_prompt},
+                {"role": "user", "content": user_query}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 400,
+        }
+        with upstream_call('query_mixtral'):
+            response = requests.post(MIXTRAL_API_URL, headers=headers, json=payload)
+            response.raise_for_status()
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+    except Exception as e:
+        logger.error(f"Error in querying Mixtral: {str(e)}")
+        return UPSTREAM_ERROR_MESSAGE
 
-# def clean_ocr_text(text):
-#     """Clean up OCR results to remove gibberish and correct errors"""
-#     lines = text.split('\n')
-#     cleaned_lines = []
-    
-#     corrections = {
-#         'bateles': 'betaloc',
-#         '1o0ag': '100 mg',
-#         'bd': 'bid',
-#         'dertolanden': 'dorzolamide',
-#         '10 ng': '10 mg',
-#         'dub': '1 tab',
-#         'comatdiee': 'cimetidine',
-#         '50 ag': '50 mg',
-#         'bml ol': 'oxprelol',
-#         'is': 'qd',
-#         '4s rn wears': 'dr steve johnson',
-#         'quan': 'quantity',
-#         'rn': 'prn',
-#     }
-    
-#     for line in lines:
-#         alpha_chars = sum(c.isalpha() for c in line)
-#         total_chars = len(line.strip())
-        
-#         if total_chars > 0 and (alpha_chars / total_chars) > 0.4 and total_chars >= 3:
-#             cleaned_line = re.sub(r'^[^a-zA-Z0-9]+', '', line)
-#             cleaned_line = re.sub(r'[^a-zA-Z0-9]+$', '', cleaned_line)
-            
-#             cleaned_line = cleaned_line.lower()
-#             for wrong, correct in corrections.items():
-#                 cleaned_line = cleaned_line.replace(wrong, correct)
-            
-#             cleaned_lines.append(cleaned_line.strip())
-    
-#     return '\n'.join(cleaned_lines) if cleaned_lines else "No readable text extracted"
+def call_ai_model(text):
+    headers = {
+        'Authorization': f'Bearer {MIXTRAL_API_KEY1}',
+        'Content-Type': 'application/json'
+    }
+    prompt = f"""
+    Analyze the following medical report text and provide a JSON response with the following fields:
+    - predictions: Array of objects with label (condition name), confidence (0-1), and explanation (short string).
+    - guidance: Array of strings with patient recommendations.
+    - primary_condition: String with the primary condition.
+    - summary: A concise summary of the medical report (2-3 sentences, layman's terms).
+    - simplified_terms: Array of objects with term (medical jargon) and explanation (simplified description).
 
-# def find_medicine_info(extracted_text):
-#     """Match extracted text with medicine database"""
-#     if MEDICINE_DB.empty:
-#         return None
-        
-#     best_match = None
-#     highest_score = 0
-    
-#     for _, row in MEDICINE_DB.iterrows():
-#         if extracted_text.lower() in row['Medicine Name'].lower():
-#             return row.to_dict()
-        
-#         score = fuzz.token_set_ratio(extracted_text, row['Medicine Name'])
-#         if score > highest_score and score > 70:
-#             highest_score = score
-#             best_match = row.to_dict()
-    
-#     if best_match is None:
-#         highest_score = 0
-#         for _, row in MEDICINE_DB.iterrows():
-#             salts = row['Composition'].split('+')
-#             for salt in salts:
-#                 salt = salt.strip()
-#                 if extracted_text.lower() in salt.lower():
-#                     return row.to_dict()
-                
-#                 score = fuzz.token_set_ratio(extracted_text, salt)
-#                 if score > highest_score and score > 70:
-#                     highest_score = score
-#                     best_match = row.to_dict()
-    
-#     return best_match
+    Report Text: {text}
 
-# @app.route("/predict", methods=["POST"])
-# def predict():
-#     if 'image' not in request.files:
-#         return jsonify({
-#             "success": False,
-#             "error": "No image uploaded",
-#             "cleaned_output": None,
-#             "raw_output": None,
-#             "medicine_info": None
-#         }), 400
-    
-#     try:
-#         img_file = request.files['image']
-#         img_bytes = img_file.read()
-#         img = Image.open(io.BytesIO(img_bytes))
-#         img_np = np.array(img)
-        
-#         processed_img = preprocess_image(img_np)
-        
-#         # Try different Tesseract configurations
-#         configs = [
-#             r'--oem 3 --psm 3',  # Fully automatic segmentation
-#             r'--oem 3 --psm 6',  # Single block of text
-#             r'--oem 3 --psm 11', # Sparse text with OSD
-#         ]
-        
-#         raw_text = ""
-#         for config in configs:
-#             temp_text = pytesseract.image_to_string(processed_img, config=config, lang='eng')
-#             logging.info(f"OCR with config {config}:\n{temp_text}")
-#             alpha_ratio = sum(c.isalpha() for c in temp_text) / max(len(temp_text), 1)
-#             if alpha_ratio > (sum(c.isalpha() for c in raw_text) / max(len(raw_text), 1)):
-#                 raw_text = temp_text
-        
-#         logging.info(f"Selected Raw OCR Output:\n{raw_text}")
-#         cleaned_raw_text = clean_ocr_text(raw_text)
-        
-#         if cleaned_raw_text.lower() != "no readable text extracted":
-#             medications = extract_medications_gemini(cleaned_raw_text)
-#             cleaned_text = "\n".join(medications) if medications else "No medications identified"
-            
-#             medicine_info_list = []
-#             if isinstance(medications, list):
-#                 for med in medications:
-#                     info = find_medicine_info(med)
-#                     if info:
-#                         medicine_info_list.append(info)
-#         else:
-#             cleaned_text = "No readable text extracted"
-#             medicine_info_list = []
-        
-#         return jsonify({
-#             "success": True,
-#             "error": None,
-#             "cleaned_output": cleaned_text,
-#             "raw_output": cleaned_raw_text,
-#             "medicine_info": medicine_info_list
-#         })
-    
-#     except Exception as e:
-#         logging.error(f"Error: {e}", exc_info=True)
-#         return jsonify({
-#             "success": False,
-#             "error": str(e),
-#             "cleaned_output": None,
-#             "raw_output": None,
-#             "medicine_info": None
-#         }), 500
+    Return only the JSON object, without any additional text, markdown, or code fences.
+    """
+    payload = {
+        'model': 'mistral-small',
+        'messages': [
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ],
+        'max_tokens': 1000,
+        'temperature': 0.9
+    }
+    try:
+        logger.debug("Sending request to Mixtral API")
+        with upstream_call('call_ai_model'):
+            response = requests.post(MIXTRAL_API_URL, json=payload, headers=headers, timeout=30)
+            response.raise_for_status()
+        data = response.json()
+        logger.debug("Raw API response: %s", data)
+        if 'choices' in data and len(data['choices']) > 0:
+            result_text = data['choices'][0].get('message', {}).get('content', '')
+            if not result_text:
+                logger.error("No content in API response")
+                return {'error': 'No content in API response'}
+            try:
+                result_text = result_text.strip()
+                if result_text.startswith('```json'):
+                    result_text = result_text.replace('```json', '').replace('```', '').strip()
+                result = json.loads(result_text)
+                logger.debug("Parsed AI response: %s", result)
+                return {
+                    'predictions': result.get('predictions', []),
+                    'guidance': result.get('guidance', []),
+                    'primary_condition': result.get('primary_condition', ''),
+                    'summary': result.get('summary', ''),
+                    'simplified_terms': result.get('simplified_terms', [])
+                }
+            except json.JSONDecodeError as e:
+                logger.error("JSON decode error: %s, response text: %s", e, result_text)
+                return {'error': f'Invalid JSON response from AI API: {str(e)}'}
+        else:
+            logger.error("Unexpected API response format: %s", data)
+            return {'error': 'No valid response from AI API'}
+    except requests.RequestException as e:
+        logger.error(f"AI API request failed: {str(e)}")
+        return {'error': f'AI API request failed: {str(e)}'}
 
-# @app.route("/health", methods=["GET"])
-# def health_check():
-#     return jsonify({
-#         "status": "healthy",
-#         "database_loaded": not MEDICINE_DB.empty,
-#         "ocr_ready": True
-#     })
 
-# if __name__ == "__main__":
-#     app.run(host="0.0.0.0", port=5000, debug=True)# import os
-    
-# # from google.cloud import vision
-# # from google.oauth2 import service_account
+# Gemini, used by the prescription reader
+def clean_json_response(response_text):
+    try:
+        cleaned = re.sub(r'^```json\s*|\s*```$', '', response_text, flags=re.MULTILINE)
+        cleaned = re.sub(r'\n\s*\n', '\n', cleaned.strip())
+        cleaned = re.sub(r'\s*,\s*', ', ', cleaned)
+        cleaned = re.sub(r'\s*:\s*', ': ', cleaned)
+        logger.debug("Cleaned JSON response: %s", cleaned)
+        return cleaned
+    except Exception as e:
+        logger.error(f"Error cleaning JSON response: {e}")
+        return response_text
 
-# # def test_vision_api():
-# #     print("GOOGLE_APPLICATION_CREDENTIALS:", os.getenv("GOOGLE_APPLICATION_CREDENTIALS"))
-# #     # Explicitly load credentials
-# #     credentials_path = "/home/muizz/Downloads/extras/prescriptionocr-456909-a46fd284b046.json"
-# #     if not os.path.exists(credentials_path):
-# #         print(f"Credentials file not found at {credentials_path}")
-# #         return
-# #     credentials = service_account.Credentials.from_service_account_file(credentials_path)
-# #     client = vision.ImageAnnotatorClient(credentials=credentials)
-# #     print("Successfully created Vision API client!")
-
-# # if __name__ == "__main__":
-# #     test_vision_api()
\ No newline at end of file
+def ml_model(image_base64=None, text=None, prompt=None, is_image=False, image_file=None, mime_type="image/jpeg"):
+    try:
+        url = f"{GEMINI_API_URL}?key={GEMINI_API_KEY}"
+        headers = {"Content-Type": "application/json"}
+        body = {"contents": [{"parts": []}]}
+        if is_image and (image_base64 or image_file is not None):
+            body["contents"][0]["parts"].append({
+                "inline_data": {
+                    "mime_type": mime_type,
+                    "data": image_base64 if image_file is None else inline_data_placeholder()
+                }
+            })
+        if text:
+            body["contents"][0]["parts"].append({"text": text})
+        if prompt:
+            body["contents"][0]["parts"].append({"text": prompt})
+        with upstream_call('ml_model'):
+            if is_image and image_file is not None:
+                # Stream the image as base64 straight into the request body
+                response = requests.post(url, headers=headers, data=iter_json_with_inline_data(body, image_file))
+            else:
+                response = requests.post(url, headers=headers, json=body)
+            logger.info(f"ML_Model Response Status: {response.status_code}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("ML_Model Response Body: %s", response.text)
+            response.raise_for_status()
+        result = response.json()
+        if "candidates" in result and result["candidates"]:
+            return result['candidates'][0]['content']['parts'][0]['text']
+        else:
+            logger.warning("ML_Model returned empty candidates: %s", result)
+            return "No text detected"
+    except requests.RequestException as e:
+        logger.error(f"ML_Model Request Error: {e}")
+        return f"ML_Model Error: {str(e)}"
+    except Exception as e:
+        logger.error(f"ML_Model Error: {e}", exc_info=True)
+        return f"call Error: {str(e)}"
@@ -0,0 +1,189 @@
+"""Personalized health tips served by demographic bucket.
+
+    python app1/health_tips.py [--workers 4] [--force]
+
+Age is bucketed into ranges, gender into male/female/other, and goal
+phrases into GOAL_TAXONOMY categories. The tips for every (age range, gender,
+single goal) bucket are generated offline by running this module, which
+writes HEALTH_TIPS_PATH. At request time a bucket in that file is served
+directly. Anything else, such as several goals or a goal outside the taxonomy,
+goes to the LLM, and the answer is cached in-process by its normalized bucket.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import HEALTH_TIPS_CACHE_SIZE, HEALTH_TIPS_CACHE_TTL, HEALTH_TIPS_PATH
+from external import UPSTREAM_ERROR_MESSAGE, query_mixtral
+from metrics import record_cache
+from resources import registry
+
+logger = logging.getLogger(__name__)
+
+# Upper bound (inclusive) and label of each age range
+AGE_BUCKETS = [(12, '0-12'), (17, '13-17'), (29, '18-29'), (44, '30-44'), (59, '45-59'), (74, '60-74'), (120, '75+')]
+
+GENDERS = {
+    'male': 'male', 'm': 'male', 'man': 'male', 'boy': 'male',
+    'female': 'female', 'f': 'female', 'woman': 'female', 'girl': 'female',
+}
+
+# Goal category -> (phrase used in prompts, keywords that map a user's goals to it)
+GOAL_TAXONOMY = {
+    'sleep': ('improve sleep', ['sleep', 'sleeping', 'insomnia', 'rest']),
+    'stress': ('reduce stress', ['stress', 'stressed', 'anxiety', 'anxious', 'relax', 'calm', 'mental health']),
+    'weight_loss': ('lose weight', ['lose weight', 'losing weight', 'weight loss', 'slim', 'fat', 'obese', 'obesity']),
+    'muscle': ('build muscle', ['muscle', 'muscles', 'strength', 'stronger', 'bulk', 'gain weight']),
+    'fitness': ('improve fitness', ['fitness', 'fit', 'fitter', 'exercise', 'active', 'stamina', 'endurance', 'cardio']),
+    'nutrition': ('eat healthier', ['diet', 'eat', 'eating', 'nutrition', 'food']),
+    'heart': ('improve heart health', ['heart', 'blood pressure', 'cholesterol', 'hypertension']),
+    'blood_sugar': ('manage blood sugar', ['diabetes', 'diabetic', 'sugar', 'glucose']),
+    'energy': ('boost energy', ['energy', 'tired', 'fatigue']),
+    'smoking': ('quit smoking', ['smoking', 'smoke', 'nicotine', 'cigarette', 'cigarettes']),
+    'immunity': ('strengthen immunity', ['immune', 'immunity']),
+    'skin': ('improve skin health', ['skin', 'acne']),
+}
+
+_GOAL_PATTERNS = {
+    category: re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')\b', re.IGNORECASE)
+    for category, (_, keywords) in GOAL_TAXONOMY.items()
+}
+
+
+def age_bucket(age):
+    age = int(age)
+    for upper, label in AGE_BUCKETS:
+        if age <= upper:
+            return label
+    return AGE_BUCKETS[-1][1]
+
+
+def normalize_gender(gender):
+    return GENDERS.get(str(gender).strip().lower(), 'other')
+
+
+def goal_categories(goals):
+    """Sorted taxonomy categories mentioned in free-text goals."""
+    return tuple(sorted(category for category, pattern in _GOAL_PATTERNS.items() if pattern.search(goals)))
+
+
+def bucket_key(age_range, gender, goals):
+    return f"{age_range}|{gender}|{goals}"
+
+
+def _normalized_bucket(age, gender, goals):
+    """Returns (cache key, prompt) for the bucket a user falls into."""
+    age_range, gender = age_bucket(age), normalize_gender(gender)
+    categories = goal_categories(goals)
+    if categories:
+        goal_key = '+'.join(categories)
+        goal_text = ', '.join(GOAL_TAXONOMY[c][0] for c in categories)
+    else:
+        # Outside the taxonomy: only identical phrasings share an answer
+        goal_text = ' '.join(goals.lower().split())
+        goal_key = 'text:' + goal_text
+    return bucket_key(age_range, gender, goal_key), _prompt(age_range, gender, goal_text)
+
+
+def _prompt(age_range, gender, goal_text):
+    return f"Age: {age_range}, Gender: {gender}, Health goals: {goal_text}"
+
+
+class _TipsCache:
+    def __init__(self, max_entries=HEALTH_TIPS_CACHE_SIZE, ttl=HEALTH_TIPS_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache = _TipsCache()
+
+
+def get_tips(age, gender, goals):
+    key, prompt = _normalized_bucket(age, gender, goals)
+    tips = registry.get('health_tips').get(key)
+    if tips is None:
+        tips = _cache.get(key)
+    record_cache('health_tips', tips is not None)
+    if tips is not None:
+        return tips
+    tips = query_mixtral(prompt, prompt_type="health_tips")
+    if tips != UPSTREAM_ERROR_MESSAGE:
+        _cache.set(key, tips)
+    return tips
+
+
+def common_buckets():
+    """Every (key, prompt) the batch job pre-generates: each age range x gender x single goal."""
+    for _, age_range in AGE_BUCKETS:
+        for gender in ('male', 'female', 'other'):
+            for category, (goal_text, _) in GOAL_TAXONOMY.items():
+                yield bucket_key(age_range, gender, category), _prompt(age_range, gender, goal_text)
+
+
+def build(path=HEALTH_TIPS_PATH, workers=4, force=False):
+    """Generate tips for every common bucket, keeping existing entries unless force is set."""
+    tips = {}
+    if not force and os.path.exists(path):
+        with open(path) as f:
+            tips = json.load(f)
+    todo = [(key, prompt) for key, prompt in common_buckets() if key not in tips]
+    logger.info("Generating %d of %d health tip buckets", len(todo), len(tips) + len(todo))
+
+    def generate(item):
+        key, prompt = item
+        return key, query_mixtral(prompt, prompt_type="health_tips")
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for key, answer in pool.map(generate, todo):
+            if answer == UPSTREAM_ERROR_MESSAGE:
+                failed += 1
+            else:
+                tips[key] = answer
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(dict(sorted(tips.items())), f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return len(tips), failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=HEALTH_TIPS_PATH, help='file to write the tips to')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent LLM requests')
+    parser.add_argument('--force', action='store_true', help='regenerate buckets that already have tips')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    total, failed = build(args.out, args.workers, args.force)
+    print(f"Wrote {total} buckets to {args.out}" + (f", {failed} failed (re-run to retry)" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import logging
+import tempfile
+
+from PIL import Image, ImageOps
+
+from config import PRESCRIPTION_MAX_EDGE, PRESCRIPTION_IMAGE_FORMAT, PRESCRIPTION_IMAGE_QUALITY
+from uploads import SPOOL_MAX_MEMORY, upload_size
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+# EXIF orientation tag; anything other than 1 means the pixels need rotating
+_ORIENTATION = 0x0112
+
+
+def prepare_prescription_image(fp, max_edge=PRESCRIPTION_MAX_EDGE, fmt=PRESCRIPTION_IMAGE_FORMAT,
+                               quality=PRESCRIPTION_IMAGE_QUALITY):
+    """Detect the real format of an uploaded image and shrink it for the vision model.
+
+    Returns (file, mime_type, stats). `file` is either fp itself, when the upload is
+    already small and in a format Gemini accepts, or a new spooled file holding the
+    re-encoded image; the caller closes both.
+    """
+    original_bytes = upload_size(fp)
+    fp.seek(0)
+    with Image.open(fp) as img:
+        original_format = img.format
+        original_size = img.size
+        needs_rotation = img.getexif().get(_ORIENTATION, 1) != 1
+        if (original_format in ('JPEG', 'WEBP') and max(original_size) <= max_edge
+                and not needs_rotation):
+            fp.seek(0)
+            return fp, MIME_TYPES[original_format], _stats(original_format, original_size, original_size,
+                                                           original_bytes, original_bytes)
+        if original_format == 'JPEG':
+            # Let the decoder do most of the downscaling via DCT scaling
+            img.draft('RGB', (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, 'white')
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        prepared = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        img.save(prepared, format=fmt, quality=quality)
+        prepared_size = img.size
+    prepared_bytes = prepared.tell()
+    if prepared_bytes >= original_bytes and original_format in MIME_TYPES and not needs_rotation \
+            and max(original_size) <= max_edge:
+        # Re-encoding didn't help; send the original
+        prepared.close()
+        fp.seek(0)
+        return fp, MIME_TYPES[original_format], _stats(original_format, original_size, original_size,
+                                                       original_bytes, original_bytes)
+    prepared.seek(0)
+    return prepared, MIME_TYPES[fmt], _stats(original_format, original_size, prepared_size,
+                                             original_bytes, prepared_bytes)
+
+
+def _stats(original_format, original_size, prepared_size, original_bytes, prepared_bytes):
+    stats = {
+        'original_format': original_format,
+        'original_size': original_size,
+        'prepared_size': prepared_size,
+        'original_bytes': original_bytes,
+        'prepared_bytes': prepared_bytes,
+        'bytes_saved': original_bytes - prepared_bytes,
+    }
+    logger.info(f"Prepared prescription image: {original_format} {original_size[0]}x{original_size[1]} "
+                f"-> {prepared_size[0]}x{prepared_size[1]}, {original_bytes} -> {prepared_bytes} bytes "
+                f"({stats['bytes_saved']} saved)")
+    return stats
@@ -0,0 +1,138 @@
+"""Adaptive symptom interview over HTTP, the web version of model.tree_to_code.
+
+The decision tree is flattened once into arrays. A client's progress is a
+small cursor it sends back with every answer:
+
+    {"v": <tree version>, "node": <node id>, "days": <int>,
+     "present": [<symptom ids>], "absent": [<symptom ids>]}
+
+The walk asks about the symptom tested at each node on the path to a leaf,
+skipping symptoms already answered, then confirms the remaining symptoms of
+the leaf's disease. Each answer moves the cursor one step.
+"""
+import hashlib
+
+import numpy as np
+
+from model import clf, le, symptoms_for_disease, vocabulary
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CompiledTree:
+    def __init__(self, tree, classes, labels):
+        t = tree.tree_
+        self.feature = t.feature.astype(np.int32)
+        self.threshold = t.threshold.astype(np.float32)
+        self.left = t.children_left.astype(np.int32)
+        self.right = t.children_right.astype(np.int32)
+        # Disease code at each leaf, -1 on internal nodes
+        leaf_codes = classes[t.value[:, 0, :].argmax(axis=1)]
+        self.disease = np.where(self.left == -1, leaf_codes, -1).astype(np.int32)
+        self.labels = labels
+        # Symptom ids to confirm for each disease code, as the CLI does
+        self.disease_symptoms = [np.array(symptoms_for_disease(label).indices, dtype=np.int32) for label in labels]
+        self.version = hashlib.sha1(b''.join(
+            a.tobytes() for a in (self.feature, self.threshold, self.left, self.right, self.disease)
+        )).hexdigest()[:12]
+
+    def is_leaf(self, node):
+        return self.left[node] == -1
+
+    def step(self, node, present):
+        """Follow one edge from an internal node given whether its symptom is present."""
+        value = 1.0 if present else 0.0
+        return int(self.right[node] if value > self.threshold[node] else self.left[node])
+
+
+tree = CompiledTree(clf, clf.classes_, le.classes_)
+symptom_names = [vocabulary.name(i) for i in range(len(vocabulary))]
+
+
+def _is_int(value):
+    # bool is an int subclass, but true is not symptom id 1
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _days(value):
+    if isinstance(value, bool):
+        raise InvalidCursor("days must be a number")
+    try:
+        days = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise InvalidCursor("days must be a number") from None
+    if days < 0:
+        raise InvalidCursor("days must be a non-negative number")
+    return days
+
+
+def start(symptom, days=0):
+    """Open an interview from the symptom the patient reported first."""
+    symptom_id = vocabulary.id(symptom)
+    if symptom_id is None:
+        raise InvalidCursor(f"Unknown symptom: {symptom}")
+    cursor = {'v': tree.version, 'node': 0, 'days': _days(days),
+              'present': [symptom_id], 'absent': []}
+    return _advance(cursor)
+
+
+def answer(cursor, reply):
+    """Record a yes/no reply to the cursor's pending question and move on."""
+    cursor = _validate(cursor)
+    pending = _pending_symptom(cursor)
+    if pending is None:
+        raise InvalidCursor("Interview is already finished")
+    cursor['present' if reply else 'absent'].append(pending)
+    return _advance(cursor)
+
+
+def result_symptoms(cursor):
+    return [symptom_names[i] for i in cursor['present']]
+
+
+def _advance(cursor):
+    """Walk down while the node's symptom is already answered; returns (cursor, next symptom or None)."""
+    node = cursor['node']
+    present, absent = set(cursor['present']), set(cursor['absent'])
+    while not tree.is_leaf(node):
+        feature = int(tree.feature[node])
+        if feature in present:
+            node = tree.step(node, True)
+        elif feature in absent:
+            node = tree.step(node, False)
+        else:
+            break
+    cursor['node'] = node
+    pending = _pending_symptom(cursor)
+    return cursor, (symptom_names[pending] if pending is not None else None)
+
+
+def _pending_symptom(cursor):
+    node = cursor['node']
+    if not tree.is_leaf(node):
+        return int(tree.feature[node])
+    answered = set(cursor['present']) | set(cursor['absent'])
+    for symptom in tree.disease_symptoms[tree.disease[node]]:
+        if int(symptom) not in answered:
+            return int(symptom)
+    return None
+
+
+def _validate(cursor):
+    if not isinstance(cursor, dict):
+        raise InvalidCursor("cursor must be an object")
+    if cursor.get('v') != tree.version:
+        raise InvalidCursor("Interview was started against a different model, please start again")
+    node = cursor.get('node')
+    present, absent = cursor.get('present'), cursor.get('absent')
+    if not _is_int(node) or not 0 <= node < len(tree.feature):
+        raise InvalidCursor("Invalid cursor node")
+    if not isinstance(present, list) or not isinstance(absent, list):
+        raise InvalidCursor("Invalid cursor symptoms")
+    for symptom in present + absent:
+        if not _is_int(symptom) or not 0 <= symptom < len(symptom_names):
+            raise InvalidCursor("Invalid cursor symptoms")
+    return {'v': tree.version, 'node': node, 'days': _days(cursor.get('days', 0)),
+            'present': list(present), 'absent': list(absent)}
@@ -0,0 +1,195 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import reprlib
+import sys
+import threading
+from collections import deque
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context
+
+from config import (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_FILE, LOG_MAX_MESSAGE_CHARS,
+                    LOG_DEBUG_SAMPLE_RATE)
+
+_configured = False
+_lock = threading.Lock()
+_queue = None
+_listener = None
+_handlers = []
+
+# Bounded repr for non-string log arguments such as upstream response dicts
+_repr = reprlib.Repr()
+_repr.maxstring = LOG_MAX_MESSAGE_CHARS
+_repr.maxother = LOG_MAX_MESSAGE_CHARS
+_repr.maxlist = _repr.maxdict = _repr.maxtuple = _repr.maxset = 50
+_repr.maxlevel = 4
+
+
+def _truncate(text, limit=LOG_MAX_MESSAGE_CHARS):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [truncated {len(text) - limit} chars]"
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class _Capped:
+    """Stands in for a container argument; %s and %r print its size-capped repr."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, value):
+        self.text = _repr.repr(value)
+
+    def __str__(self):
+        return self.text
+
+    __repr__ = __str__
+
+
+class PayloadTruncator(logging.Filter):
+    """Cap the size of log messages and their arguments before they are queued.
+
+    Strings and bytes are shortened and containers are replaced by a capped
+    repr, so a multi-megabyte response body is never formatted in full. Other
+    arguments (numbers, numpy scalars, exceptions) are left as they are so
+    %d, %f and %s still apply to them. A single mapping argument stays a
+    mapping for "%(name)s" formats.
+    """
+
+    def filter(self, record):
+        if isinstance(record.msg, str):
+            record.msg = _truncate(record.msg)
+        else:
+            record.msg = _repr.repr(record.msg)
+        if isinstance(record.args, Mapping):
+            record.args = {key: self._shorten(value) for key, value in record.args.items()}
+        elif record.args:
+            record.args = tuple(self._shorten(arg) for arg in record.args)
+        if has_request_context():
+            record.request_id = g.get('request_id')
+        return True
+
+    @staticmethod
+    def _shorten(arg):
+        if isinstance(arg, str):
+            return _truncate(arg)
+        if isinstance(arg, (bytes, bytearray)):
+            if len(arg) <= LOG_MAX_MESSAGE_CHARS:
+                return arg
+            return bytes(arg[:LOG_MAX_MESSAGE_CHARS]) + f"... [truncated {len(arg) - LOG_MAX_MESSAGE_CHARS} bytes]".encode()
+        if isinstance(arg, (list, tuple, set, frozenset, dict, deque)):
+            return _Capped(arg)
+        return arg
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            entry['request_id'] = request_id
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare formats the message on the calling thread. The
+    # truncation filter has already made the record safe to hand over, so
+    # leave formatting to the listener.
+    def prepare(self, record):
+        if record.exc_info:
+            # Render the traceback now; the frames may be gone by the time the listener runs
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_handlers():
+    formatter = JsonFormatter() if LOG_FORMAT == 'json' else logging.Formatter(
+        '%(asctime)s %(levelname)s [%(name)s] %(message)s')
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if LOG_FILE:
+        handlers.append(logging.FileHandler(LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _start_listener():
+    global _listener
+    _listener = QueueListener(_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_listener_after_fork():
+    # The listener thread doesn't survive fork, so each gunicorn worker starts its own
+    global _queue
+    if _listener is None:
+        return
+    _queue = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, _DeferredQueueHandler):
+            handler.queue = _queue
+    _start_listener()
+
+
+def _stop_listener():
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def configure_logging():
+    """Route all logging through a queue to a background writer thread.
+
+    Levels come from LOG_LEVEL (root) and LOG_LEVELS ("name=LEVEL,..."), DEBUG
+    records are sampled at LOG_DEBUG_SAMPLE_RATE, and messages and arguments
+    are truncated to LOG_MAX_MESSAGE_CHARS. Safe to call more than once.
+    """
+    global _configured, _queue, _handlers
+    with _lock:
+        if _configured:
+            return
+        _queue = queue.SimpleQueue()
+        _handlers = _build_handlers()
+        queue_handler = _DeferredQueueHandler(_queue)
+        queue_handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE_RATE))
+        queue_handler.addFilter(PayloadTruncator())
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(LOG_LEVEL)
+        for name, level in LOG_LEVELS.items():
+            logging.getLogger(name).setLevel(level)
+
+        _start_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_restart_listener_after_fork)
+        _configured = True
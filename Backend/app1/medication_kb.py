@@ -0,0 +1,152 @@
+"""Answer simple medication questions from MEDICINE_DB instead of the LLM.
+
+Medicines are indexed by brand (the first word of "Medicine Name") and by
+each active ingredient in "Composition". A question is answered locally when
+it names indexed medicines, asks for their uses and/or side effects, and says
+nothing else. "Side effects of ibuprofen" is answered from the dataset, but
+"side effects of ibuprofen during pregnancy" is not, because the dataset has
+nothing about pregnancy. Everything else returns None and goes to the LLM.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from metrics import record_cache
+from resources import registry
+
+MISSING = 'Not specified'
+MAX_NAME_WORDS = 4
+
+# Field -> pattern for questions that ask for it
+FIELD_PATTERNS = {
+    'Uses': re.compile(r'\b(?:uses|used (?:for|to)|usage|purpose|indications?|treats?|what is .+ for|what does .+ do)\b'),
+    'Side_effects': re.compile(r'\b(?:side ?effects?|adverse (?:effects?|reactions?))\b'),
+}
+FIELD_LABELS = {'Uses': '💡 Uses', 'Side_effects': '⚠️ Side effects'}
+
+NEGATIONS = {'no', 'not', 'nor', 'never', 'cannot', 'none', 'nothing', 'without'}
+# Words a question may contain on top of medicine names and still be answered locally
+FILLER_WORDS = (ENGLISH_STOP_WORDS - NEGATIONS) | {
+    'tell', 'know', 'list', 'explain', 'common', 'main', 'possible', 'usual', 'typical', 'known',
+    'medicine', 'medicines', 'medication', 'medications', 'drug', 'drugs', 'tablet', 'tablets',
+    'capsule', 'capsules', 'pill', 'pills', 'syrup', 'injection', 'cream', 'gel',
+    'uses', 'use', 'used', 'usage', 'purpose', 'indication', 'indications', 'treat', 'treats',
+    'side', 'effect', 'effects', 'sideeffects', 'adverse', 'reaction', 'reactions', 'cause', 'causes',
+}
+_DOSE = re.compile(r'^\d+(?:\.\d+)?(?:mg|mcg|ml|g|iu|%)?$')
+_WORD = re.compile(r'[a-z0-9][a-z0-9.%-]*')
+
+
+def _words(text):
+    return [w.rstrip('.') for w in _WORD.findall(str(text).lower())]
+
+
+def _ingredients(composition):
+    """'Amoxycillin (500mg) + Clavulanic Acid (125mg)' -> ['amoxycillin', 'clavulanic acid'] as word tuples."""
+    without_doses = re.sub(r'\([^)]*\)', ' ', str(composition))
+    return [tuple(_words(part)) for part in without_doses.split('+') if _words(part)]
+
+
+def _most_common(values):
+    values = [v for v in values if v and v != MISSING]
+    return Counter(values).most_common(1)[0][0] if values else None
+
+
+class MedicationIndex:
+    """Medicine name (as a word tuple) -> display name and the usual value of each field."""
+
+    def __init__(self, medicine_db):
+        rows = defaultdict(list)
+        display = {}
+        names = medicine_db['Medicine Name'].tolist() if not medicine_db.empty else []
+        compositions = medicine_db['Composition'].tolist() if not medicine_db.empty else []
+        for position, (name, composition) in enumerate(zip(names, compositions)):
+            brand = _words(name)[:1]
+            if brand and self._indexable(brand[0]):
+                key = tuple(brand)
+                rows[key].append(position)
+                display.setdefault(key, str(name).split()[0])
+            for key in _ingredients(composition):
+                if len(key) <= MAX_NAME_WORDS and self._indexable(' '.join(key)):
+                    rows[key].append(position)
+                    display.setdefault(key, ' '.join(w.capitalize() for w in key))
+
+        self.entries = {}
+        for key, positions in rows.items():
+            fields = {field: _most_common(medicine_db[field].iloc[positions].tolist()) for field in FIELD_PATTERNS}
+            self.entries[key] = (display[key], fields)
+
+    @staticmethod
+    def _indexable(name):
+        # Short or common words as brand names ("Pan 40", "Just") would match ordinary questions
+        return len(name) >= 4 and name not in FILLER_WORDS and not _DOSE.match(name)
+
+    def find(self, words):
+        """Medicine keys named in a list of words, longest match first, with the positions they cover."""
+        found, covered, i = [], set(), 0
+        while i < len(words):
+            for n in range(min(MAX_NAME_WORDS, len(words) - i), 0, -1):
+                key = tuple(words[i:i + n])
+                if key in self.entries:
+                    if key not in found:
+                        found.append(key)
+                    covered.update(range(i, i + n))
+                    i += n
+                    break
+            else:
+                i += 1
+        return found, covered
+
+
+_index = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def medication_index():
+    """The index for the current medicine_db, rebuilt if the dataset is replaced."""
+    global _index, _index_source
+    medicine_db = registry.get('medicine_db')
+    if _index_source is not medicine_db:
+        with _index_lock:
+            if _index_source is not medicine_db:
+                _index = MedicationIndex(medicine_db)
+                _index_source = medicine_db
+    return _index
+
+
+def answer(question):
+    """Answer a uses/side-effects question from the dataset, or None if it needs the LLM."""
+    start = time.perf_counter()
+    text = _answer(question)
+    record_cache('medication_kb', text is not None, time.perf_counter() - start)
+    return text
+
+
+def _answer(question):
+    normalized = ' '.join(_words(question))
+    fields = [field for field, pattern in FIELD_PATTERNS.items() if pattern.search(normalized)]
+    if not fields:
+        return None
+    words = normalized.split()
+    index = medication_index()
+    medicines, covered = index.find(words)
+    if not medicines:
+        return None
+    leftover = [w for i, w in enumerate(words) if i not in covered and w not in FILLER_WORDS and not _DOSE.match(w)]
+    if leftover:
+        return None
+
+    sections = []
+    for key in medicines:
+        name, values = index.entries[key]
+        if any(values[field] is None for field in fields):
+            return None
+        lines = [f"💊 {name}"] + [f"{FIELD_LABELS[field]}: {values[field]}" for field in fields]
+        sections.append('\n'.join(lines))
+    return ('\n\n'.join(sections) +
+            "\n\nThis is general information from our medicine database. Ask a doctor or pharmacist "
+            "before starting or stopping any medication.")
@@ -0,0 +1,122 @@
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY,
+                               generate_latest, multiprocess)
+
+# Upper bounds in seconds, shared by every latency histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Upper bounds in bytes for upload sizes, 32KB to 16MB
+SIZE_BUCKETS = tuple(32 * 1024 * 2 ** i for i in range(10))
+
+HTTP_REQUESTS = Counter(
+    'docconnect_http_requests_total', 'HTTP requests handled', ['route', 'method', 'status'])
+HTTP_LATENCY = Histogram(
+    'docconnect_http_request_duration_seconds', 'HTTP request latency', ['route'], buckets=LATENCY_BUCKETS)
+STAGE_LATENCY = Histogram(
+    'docconnect_stage_duration_seconds', 'Latency of one pipeline stage within a request', ['route', 'stage'],
+    buckets=LATENCY_BUCKETS)
+UPSTREAM_REQUESTS = Counter(
+    'docconnect_upstream_requests_total', 'Calls to upstream LLM services', ['upstream'])
+UPSTREAM_ERRORS = Counter(
+    'docconnect_upstream_errors_total', 'Failed calls to upstream LLM services', ['upstream'])
+UPSTREAM_LATENCY = Histogram(
+    'docconnect_upstream_request_duration_seconds', 'Upstream LLM call latency', ['upstream'],
+    buckets=LATENCY_BUCKETS)
+OCR_PAGES = Counter(
+    'docconnect_ocr_pages_total', 'Report pages turned into text, by source', ['source'])
+OCR_PAGE_LATENCY = Histogram(
+    'docconnect_ocr_page_duration_seconds', 'Tesseract time per page', buckets=LATENCY_BUCKETS)
+CACHE_LOOKUPS = Counter(
+    'docconnect_cache_lookups_total', 'Cache lookups, by cache and result (hit or miss)', ['cache', 'result'])
+CACHE_LOOKUP_LATENCY = Histogram(
+    'docconnect_cache_lookup_duration_seconds', 'Time to search a cache, by cache', ['cache'],
+    buckets=LATENCY_BUCKETS)
+PRESCRIPTION_IMAGE_BYTES = Histogram(
+    'docconnect_prescription_image_bytes', 'Prescription image size before and after preparation',
+    ['version'], buckets=SIZE_BUCKETS)
+PRESCRIPTION_IMAGE_BYTES_SAVED = Counter(
+    'docconnect_prescription_image_bytes_saved_total', 'Bytes not sent upstream thanks to image preparation')
+MODEL_INFERENCE = Histogram(
+    'docconnect_model_inference_duration_seconds', 'Disease model inference time', ['model'],
+    buckets=LATENCY_BUCKETS)
+
+
+@contextmanager
+def upstream_call(upstream):
+    """Time an upstream call; an exception escaping the block counts as an error."""
+    UPSTREAM_REQUESTS.labels(upstream).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.labels(upstream).inc()
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(upstream).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def model_inference(model):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        MODEL_INFERENCE.labels(model).observe(time.perf_counter() - start)
+
+
+def record_ocr_pages(source, pages, seconds=None):
+    OCR_PAGES.labels(source).inc(pages)
+    if seconds is not None and pages:
+        per_page = seconds / pages
+        for _ in range(pages):
+            OCR_PAGE_LATENCY.observe(per_page)
+
+
+def record_image_prep(stats):
+    """Record the stats dict returned by image_prep.prepare_prescription_image."""
+    PRESCRIPTION_IMAGE_BYTES.labels('original').observe(stats['original_bytes'])
+    PRESCRIPTION_IMAGE_BYTES.labels('prepared').observe(stats['prepared_bytes'])
+    PRESCRIPTION_IMAGE_BYTES_SAVED.inc(max(stats['bytes_saved'], 0))
+
+
+def record_cache(cache, hit, seconds=None):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+    if seconds is not None:
+        CACHE_LOOKUP_LATENCY.labels(cache).observe(seconds)
+
+
+def _route():
+    # Unmatched paths share one label so scanners can't blow up the series count
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def _collect():
+    # Under gunicorn each worker writes its samples to PROMETHEUS_MULTIPROC_DIR,
+    # and whichever worker serves the scrape aggregates all of them.
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def init_app(app):
+    @app.before_request
+    def start_metrics_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.get('metrics_start')
+        if start is not None:
+            route = _route()
+            HTTP_REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+            HTTP_LATENCY.labels(route).observe(time.perf_counter() - start)
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        return Response(_collect(), mimetype=CONTENT_TYPE_LATEST)
@@ -5,33 +5,28 @@ import pandas as pd
 # To read csv dataset files
 import csv
 
-# Regular expression, for pattern matching
-import re
-
 # The preprocessing module provides functions for data preprocessing tasks such as scaling and handling missing data.
 from sklearn import preprocessing
 
-# For Visualization
-import seaborn as sns
-import matplotlib.pyplot as plt
-
 # train-test split
 from sklearn.model_selection import train_test_split
 
 # For building decision tree models, and _tree to access low-level decision of tree structure
 from sklearn.tree import DecisionTreeClassifier, _tree
 
-# For evaluating model performance using cross_validation
-from sklearn.model_selection import cross_val_score
-
-# Import Support Vector Classification from sklearn library for model deployment
-from sklearn.svm import SVC
-
-from sklearn.model_selection import GridSearchCV
 # Remove unecessary warnings
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
-import re
+import logging
+from types import MappingProxyType
+from typing import NamedTuple
+
+from artifacts import load_disease_model, load_training_data, train_disease_model
+from config import DIFFERENTIAL_TOP_K, DIFFERENTIAL_MIN_PROBABILITY
+from severity import SeverityTable
+from vocabulary import DiseaseDict, SymptomVocabulary, normalize_disease
+
+logger = logging.getLogger(__name__)
 
 """## Exploratory Data Analysis (EDA)
 
@@ -42,9 +37,9 @@ import os
 # Get the directory of the current script
 base_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Load Datasets for training and testing
-training = pd.read_csv(os.path.join(base_dir, 'Data/Training.csv'))
-testing = pd.read_csv(os.path.join(base_dir, 'Data/Testing.csv'))
+# Load the training data: a read-only uint8 symptom matrix, memory-mapped from
+# the prebuilt artifacts when present so forked workers share one copy
+training_data = load_training_data()
 
 # # Number of rows and columns
 # shape = training.shape
@@ -65,14 +60,16 @@ testing = pd.read_csv(os.path.join(base_dir, 'Data/Testing.csv'))
 # Print First eight rows of the Dataset
 # training.head(8)
 
-cols= training.columns
-cols= cols[:-1]
+cols = pd.Index(training_data.features)
+
+# x stores the symptom matrix, one uint8 column per symptom
+x = training_data.X
 
-# x stores every column data except the last one
-x = training[cols]
+# y stores the target variable for disease prediction, as label codes
+y = training_data.y
 
-# y stores the target variable for disease prediction
-y = training['prognosis']
+# Every spelling of every symptom, mapped to its feature column
+vocabulary = SymptomVocabulary(cols, prevalence=np.asarray(x.sum(axis=0)))
 
 # # Figsize used to define size of the figure
 # plt.figure(figsize=(10, 20))
@@ -83,54 +80,54 @@ y = training['prognosis']
 # # Show used to display the figure on screen
 # plt.show()
 
-# Grouping Data by Prognosis and Finding Maximum Values
-reduced_data = training.groupby(training['prognosis']).max()
+class DiseaseSymptoms(NamedTuple):
+    indices: tuple
+    names: tuple
+
+# Symptoms seen with each disease (the prognosis group-by max), keyed by normalized
+# disease name. Read-only, shared by the CLI interview and the HTTP one.
+disease_symptoms = MappingProxyType({
+    normalize_disease(disease): DiseaseSymptoms(
+        tuple(int(i) for i in np.flatnonzero(row)), tuple(vocabulary.name(i) for i in np.flatnonzero(row)))
+    for disease, row in zip(training_data.classes, training_data.disease_symptoms)
+})
 
-# Display the first five rows of the reduced data
-reduced_data.head()
+def symptoms_for_disease(disease):
+    return disease_symptoms.get(normalize_disease(disease), DiseaseSymptoms((), ()))
 
 """## Data Pre-processing"""
 
 # Mapping categorical strings to numerical labels using LabelEncoder
 le = preprocessing.LabelEncoder()
 
-# Fit the label encoder to the target variable 'y' and transform it
-le.fit(y)
-y = le.transform(y)
+# The artifacts already hold y as codes, so the encoder only needs the class names
+le.fit(training_data.classes)
 
 # Splitting the dataset into training and testing
 x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=0.33, random_state=42)
 
-# Features for testing except the last variable
-testx    = testing[cols]
-
-# Target variable for Testing
-testy    = testing['prognosis']
-
-# Transforming categorical value into numerical labels
-testy    = le.transform(testy)
+# Calibrated ensemble that ranks every disease in one predict_proba call
+disease_model = load_disease_model(cols, le.classes_)
+if disease_model is None:
+    logger.warning("No usable disease model artifact, training one now (run app1/artifacts.py to prebuild it)")
+    disease_model = train_disease_model(x, y)
 
 """## Model building and evaluation"""
 
 # Decision Tree Model Implementation
-clf1  = DecisionTreeClassifier()
+# Fixed seed so every worker and restart grows the same tree (interview cursors hold node ids)
+clf1  = DecisionTreeClassifier(random_state=0)
 
 # Fitting the Training Data
 clf = clf1.fit(x_train,y_train)
 
-# Cross-Validation for Model Evaluation
-scores = cross_val_score(clf, x_test, y_test, cv=3)
-
-# Print the Mean Score
+# # Cross-Validation for Model Evaluation
+# scores = cross_val_score(clf, x_test, y_test, cv=3)
 # print("Mean Score: ",scores.mean())
 
-# Creating Support Vector Machine Model
-model=SVC()
-
-# Train the model on Training Data
-model.fit(x_train,y_train)
-
-# Print accuracy for SVM Model on the training set
+# # Support Vector Machine Model, for comparison
+# model=SVC()
+# model.fit(x_train,y_train)
 # print("Accuracy score for svm: ", model.score(x_test,y_test))
 
 # Calculate feature importance using the trained Decision tree classifier
@@ -145,25 +142,15 @@ features = cols
 # Initialize dictionaries to store symptom severity, description, and precautions
 
 severityDictionary=dict()
-description_list = dict()
-precautionDictionary=dict()
+description_list = DiseaseDict()
+precautionDictionary=DiseaseDict()
 
-# Dictionary to map symptoms to their indices
-symptoms_dict = {}
-
-# Populate symptoms dictionary with indices
-for index, symptom in enumerate(x):
-       symptoms_dict[symptom] = index
+# Severity weights aligned to the symptom columns
+severity_table = SeverityTable(vocabulary)
 
 # Function to calculate the overall severity of the symptom
 def calc_condition(exp,days):
-    sum=0
-    for item in exp:
-         sum=sum+severityDictionary[item]
-    if((sum*days)/(len(exp)+1)>13):
-        print("You should take the consultation from doctor. ")
-    else:
-        print("It might not be that bad but you should take precautions.")
+    return severity_table.assess([exp], [days])[0]
 
 # param_grid_dt = {
 #     'criterion': ['gini', 'entropy'],
@@ -216,7 +203,7 @@ def getDescription():
                 description_list[row[0].strip()] = row[1].strip()  # Ensure keys and values are stripped
     except Exception as e:
         print(f"Error loading descriptions: {e}")
-        description_list = {}
+        description_list = DiseaseDict()
 
 # Function to read and store symptom severity information from a CSV file
 def getSeverityDict():
@@ -249,15 +236,10 @@ def getInfo():
     print("Hello", name)
 
 def check_pattern(dis_list, inp):
-    pred_list = []
-    inp = inp.replace(' ', '_')  # Replace spaces with underscores for matching
-    patt = f"{inp}"
-    regexp = re.compile(patt, re.IGNORECASE)  # Make the matching case-insensitive
-    pred_list = [item for item in dis_list if regexp.search(item)]
+    # Spaces, hyphens, underscores and case are ignored, so "skin rash" finds skin-rash
+    pred_list = vocabulary.search(inp, dis_list)
     
-    # Debugging: Log the input and matched symptoms
-    print(f"Input: {inp}")
-    print(f"Matched Symptoms: {pred_list}")
+    logger.debug("Input: %s, Matched Symptoms: %s", inp, pred_list)
     
     if len(pred_list) > 0:
         return 1, pred_list
@@ -275,19 +257,7 @@ def check_pattern(dis_list, inp):
 #         return 0, []
 
 def sec_predict(symptoms_exp):
-    df = pd.read_csv(os.path.join(base_dir, 'Data/Training.csv'))  # Use base_dir
-    X = df.iloc[:, :-1]
-    y = df['prognosis']
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=20)
-    rf_clf = DecisionTreeClassifier()
-    rf_clf.fit(X_train, y_train)
-
-    symptoms_dict = {symptom: index for index, symptom in enumerate(X)}
-    input_vector = np.zeros(len(symptoms_dict))
-    for item in symptoms_exp:
-        input_vector[symptoms_dict[item]] = 1
-
-    return rf_clf.predict([input_vector])
+    return np.array([rank_diseases([symptoms_exp], k=1)[0][0][0]])
 
 def print_disease(node):
     node = node[0]
@@ -324,26 +294,85 @@ dis_list = [
     "silver_like_dusting", "small_dents_in_nails", "inflammatory_nails", "blister", "red_sore_around_nose", 
     "yellow_crust_ooze"
 ]
-import csv
-
-def get_doctor_recommendations(disease):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    doctors_file = os.path.join(base_dir, 'Data/Doctor.csv')
-    recommendations = []
-
+# Doctor recommendations grouped by normalized disease name, read once at import
+def load_doctor_table():
+    table = {}
     try:
-        with open(doctors_file, mode='r') as csv_file:
-            csv_reader = csv.DictReader(csv_file)
-            for row in csv_reader:
-                if row['Disease'].strip().lower() == disease.strip().lower():
-                    recommendations.append({
-                        "doctor_name": row['doctor_name'],
-                        "hospital": row['hospital'],
-                    })
+        with open(os.path.join(base_dir, 'Data/Doctor.csv'), mode='r') as csv_file:
+            for row in csv.DictReader(csv_file):
+                table.setdefault(normalize_disease(row['Disease']), []).append({
+                    "doctor_name": row['doctor_name'],
+                    "hospital": row['hospital'],
+                })
     except Exception as e:
         print(f"Error reading doctors file: {e}")
+    return table
+
+doctor_table = load_doctor_table()
+
+def get_doctor_recommendations(disease):
+    # Copies, so callers can't mutate the shared table
+    return [dict(doc) for doc in doctor_table.get(normalize_disease(disease), [])]
+
+class UnknownSymptomsError(ValueError):
+    def __init__(self, symptoms):
+        super().__init__(f"Unknown symptoms: {', '.join(map(str, symptoms))}")
+        self.symptoms = symptoms
+
+def _symptom_matrix(symptom_sets):
+    matrix = np.zeros((len(symptom_sets), len(vocabulary)), dtype=np.uint8)
+    for row, symptoms in enumerate(symptom_sets):
+        ids, unknown = vocabulary.ids(symptoms)
+        if unknown:
+            raise UnknownSymptomsError(unknown)
+        matrix[row, ids] = 1
+    return matrix
+
+def rank_diseases(symptom_sets, k=DIFFERENTIAL_TOP_K, min_probability=DIFFERENTIAL_MIN_PROBABILITY):
+    """Rank the k most likely diseases for each list of symptoms.
+
+    Returns one list of (disease, probability) per input, best first. Diseases
+    below min_probability are dropped, but the top one is always kept.
+    """
+    return _rank(_symptom_matrix(symptom_sets), k, min_probability)
+
+def _rank(matrix, k=DIFFERENTIAL_TOP_K, min_probability=DIFFERENTIAL_MIN_PROBABILITY):
+    proba = disease_model.predict_proba(matrix)
+    top = np.argsort(-proba, axis=1, kind='stable')[:, :k]
+    labels = le.inverse_transform(disease_model.classes_[top.ravel()]).reshape(top.shape)
+    ranked = []
+    for row in range(matrix.shape[0]):
+        ranked.append([
+            (str(labels[row, i]), float(proba[row, top[row, i]]))
+            for i in range(top.shape[1])
+            if i == 0 or proba[row, top[row, i]] >= min_probability
+        ])
+    return ranked
+
+def predict_batch(symptom_sets, k=DIFFERENTIAL_TOP_K):
+    """Rank diseases for each list of symptoms with a single model call.
+
+    Returns one differential (see rank_diseases) per input, or an
+    UnknownSymptomsError in its place when the list names symptoms the model
+    doesn't know. Rows with errors are left out of the prediction.
+    """
+    results = [None] * len(symptom_sets)
+    valid, valid_ids = [], []
+    for row, symptoms in enumerate(symptom_sets):
+        ids, unknown = vocabulary.ids(symptoms)
+        if unknown:
+            results[row] = UnknownSymptomsError(unknown)
+        else:
+            valid.append(row)
+            valid_ids.append(ids)
 
-    return recommendations
+    if valid:
+        matrix = np.zeros((len(valid), len(vocabulary)), dtype=np.uint8)
+        for i, ids in enumerate(valid_ids):
+            matrix[i, ids] = 1
+        for row, differential in zip(valid, _rank(matrix, k)):
+            results[row] = differential
+    return results
 
 def tree_to_code(tree, feature_names):
     tree_ = tree.tree_
@@ -352,7 +381,7 @@ def tree_to_code(tree, feature_names):
         for i in tree_.feature
     ]
 
-    chk_dis = ",".join(feature_names).split(",")
+    chk_dis = vocabulary.names
     symptoms_present = []
 
     while True:
@@ -388,7 +417,7 @@ def tree_to_code(tree, feature_names):
             name = feature_name[node]
             threshold = tree_.threshold[node]
 
-            if name == disease_input:
+            if tree_.feature[node] == vocabulary.id(disease_input):
                 val = 1
             else:
                 val = 0
@@ -400,12 +429,7 @@ def tree_to_code(tree, feature_names):
         else:
             present_disease = print_disease(tree_.value[node])
 
-            red_cols = reduced_data.columns
-            try:
-                symptoms_given = red_cols[reduced_data.loc[present_disease].values[0].nonzero()]
-            except KeyError as e:
-                print(f"KeyError: {e}")
-                symptoms_given = None  # or handle it appropriately
+            symptoms_given = symptoms_for_disease(present_disease[0]).names
 
             print("")
 
@@ -425,47 +449,24 @@ def tree_to_code(tree, feature_names):
                 if inp == "yes":
                     symptoms_exp.append(syms)
 
-            second_prediction = sec_predict(symptoms_exp)
-            calc_condition(symptoms_exp, num_days)
-            if present_disease[0] == second_prediction[0]:
-                print("")
-                print("You may have ", present_disease[0])
-                print(description_list[present_disease[0].strip()])  # Strip key when accessing
+            # One calibrated pass ranks the alternatives, instead of a second tree
+            differential = rank_diseases([symptoms_exp])[0]
+            print(calc_condition(symptoms_exp, num_days)['message'])
+            print("")
+            print("You may have ", " or ".join(f"{disease} ({probability:.0%})" for disease, probability in differential))
+            for disease, _ in differential:
+                print(description_list[disease.strip()])  # Strip key when accessing
 
-                # Get doctor recommendations for the predicted disease
-                doctor_recommendations = get_doctor_recommendations(present_disease[0])
+            for disease, _ in differential:
+                doctor_recommendations = get_doctor_recommendations(disease)
                 if doctor_recommendations:
-                    print("\nRecommended Doctors:")
+                    print("\nRecommended Doctors for", disease, ":")
                     for doc in doctor_recommendations:
                         print(f"Doctor Name: {doc['doctor_name']}, Hospital: {doc['hospital']}")
                 else:
-                    print("\nNo specific doctor recommendations found for this disease.")
-
-            else:
-                print("")
-                print("You may have ", present_disease[0], "or ", second_prediction[0])
-                print(description_list[present_disease[0].strip()])  # Strip key when accessing
-                print(description_list[second_prediction[0].strip()])  # Strip key when accessing
-
-                # Get doctor recommendations for the predicted diseases
-                doctor_recommendations_1 = get_doctor_recommendations(present_disease[0])
-                doctor_recommendations_2 = get_doctor_recommendations(second_prediction[0])
-
-                if doctor_recommendations_1:
-                    print("\nRecommended Doctors for", present_disease[0], ":")
-                    for doc in doctor_recommendations_1:
-                        print(f"Doctor Name: {doc['doctor_name']}, Hospital: {doc['hospital']}")
-                else:
-                    print("\nNo specific doctor recommendations found for", present_disease[0])
-
-                if doctor_recommendations_2:
-                    print("\nRecommended Doctors for", second_prediction[0], ":")
-                    for doc in doctor_recommendations_2:
-                        print(f"Doctor Name: {doc['doctor_name']}, Hospital: {doc['hospital']}")
-                else:
-                    print("\nNo specific doctor recommendations found for", second_prediction[0])
+                    print("\nNo specific doctor recommendations found for", disease)
 
-            precution_list = precautionDictionary[present_disease[0].strip()]  # Strip key when accessing
+            precution_list = precautionDictionary[differential[0][0].strip()]  # Strip key when accessing
             print("Take following measures : ")
             for i, j in enumerate(precution_list):
                 print(i + 1, ")", j)
@@ -477,8 +478,6 @@ getSeverityDict()
 getDescription()
 getprecautionDict()
 
-# Ensure description_list keys are stripped (this is fine to run on import)
-description_list = {key.strip(): value for key, value in description_list.items()}
 
 # Move CLI interaction code into a main block
 if __name__ == "__main__":
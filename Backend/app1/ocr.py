@@ -0,0 +1,108 @@
+import atexit
+import importlib.util
+import logging
+import multiprocessing
+import os
+import subprocess
+import threading
+
+import pytesseract
+
+from config import OCR_BACKEND, OCR_WORKERS, OCR_LANG, PDF_TEXT_MIN_CHARS
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_pool_disabled = False
+
+# Set in each pool worker by _init_worker
+_api = None
+
+
+def _init_worker(lang):
+    global _api
+    import tesserocr
+    _api = tesserocr.PyTessBaseAPI(lang=lang)
+
+
+def _worker_image_to_string(image):
+    _api.SetImage(image)
+    return _api.GetUTF8Text()
+
+
+def _get_pool():
+    """Return this process's OCR worker pool, starting it on first use.
+
+    Pools don't survive a fork, so a pool created before a server forked its
+    workers is ignored and each worker process starts its own.
+    """
+    global _pool, _pool_pid, _pool_disabled
+    if OCR_BACKEND != 'tesserocr' or _pool_disabled:
+        return None
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            return _pool
+        if importlib.util.find_spec('tesserocr') is None:
+            logger.warning("OCR_BACKEND=tesserocr but tesserocr is not installed, using pytesseract")
+            _pool_disabled = True
+            return None
+        logger.info(f"Starting {OCR_WORKERS} tesserocr workers (lang={OCR_LANG})")
+        _pool = multiprocessing.Pool(OCR_WORKERS, initializer=_init_worker, initargs=(OCR_LANG,))
+        _pool_pid = os.getpid()
+        return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.terminate()
+            _pool.join()
+        _pool = None
+        _pool_pid = None
+
+
+atexit.register(shutdown_pool)
+
+
+def images_to_strings(images):
+    """OCR a list of PIL images, returning one string per image in order.
+
+    Uses the warm tesserocr pool when configured, falling back to pytesseract
+    if the pool is unavailable or fails.
+    """
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            return pool.map(_worker_image_to_string, images)
+        except Exception as e:
+            logger.error(f"tesserocr pool failed, falling back to pytesseract: {e}")
+    return [pytesseract.image_to_string(image, lang=OCR_LANG) for image in images]
+
+
+def extract_pdf_text_layer(pdf_path):
+    """Return the embedded text of each PDF page using pdftotext from poppler-utils.
+
+    Returns an empty list when the text layer can't be read (scanned-only,
+    encrypted or malformed PDFs, or pdftotext missing), so callers OCR everything.
+    """
+    try:
+        result = subprocess.run(['pdftotext', '-layout', '-enc', 'UTF-8', pdf_path, '-'],
+                                capture_output=True, check=True, timeout=60)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"pdftotext failed, falling back to OCR: {e}")
+        return []
+    text = result.stdout.decode('utf-8', errors='replace')
+    # pdftotext ends every page, including the last, with a form feed
+    pages = text.split('\f')
+    if text.endswith('\f'):
+        pages.pop()
+    return pages
+
+
+def has_text_layer(page_text):
+    return sum(ch.isalnum() for ch in page_text) >= PDF_TEXT_MIN_CHARS
@@ -1,63 +1,155 @@
-# from flask import Flask, request, jsonify
-# from flask_cors import CORS
-# from model import check_pattern, sec_predict, calc_condition, getDescription, getSeverityDict, getprecautionDict, description_list, precautionDictionary, severityDictionary, cols, clf, le, get_doctor_recommendations
-# import numpy as np
-
-# app = Flask(__name__)
-# CORS(app)
-
-# # Load symptom descriptions and precautions
-# getSeverityDict()
-# getDescription()
-# getprecautionDict()
-
-# # Route to handle symptom matching
-# @app.route('/match-symptoms', methods=['POST'])
-# def match_symptoms():
-#     try:
-#         data = request.json
-#         user_input = data.get('symptom', '')
-#         dis_list = cols.tolist()  # Use the columns from model.py
-#         conf, matched_symptoms = check_pattern(dis_list, user_input)
-#         return jsonify({
-#             "confidence": conf,
-#             "matched_symptoms": matched_symptoms
-#         })
-#     except Exception as e:
-#         return jsonify({"error": str(e)}), 500
-
-# # Route to handle disease prediction
-# @app.route('/predict-disease', methods=['POST'])
-# def predict():
-#     try:
-#         data = request.json
-#         symptoms = data.get('symptoms', [])
-#         days = data.get('days', 0)
-
-#         # Predict disease using sec_predict from model.py
-#         predicted_disease = sec_predict(symptoms)
-
-#         # Get description and precautions
-#         description = description_list.get(predicted_disease[0], "No description available.")
-#         precautions = precautionDictionary.get(predicted_disease[0], ["No precautions available."])
-
-#         # Calculate severity using calc_condition from model.py
-#         severity_message = calc_condition(symptoms, days)
-
-#         # Get doctor recommendations (only called here, with the predicted disease)
-#         doctor_recommendations = get_doctor_recommendations(predicted_disease[0])
-
-#         # Return response
-#         return jsonify({
-#             "disease": predicted_disease[0],
-#             "description": description,
-#             "precautions": precautions,
-#             "severity_message": severity_message,
-#             "doctor_recommendations": doctor_recommendations
-#         })
-#     except Exception as e:
-#         return jsonify({"error": str(e)}), 500
-
-# # Run the Flask app
-# if __name__ == "__main__":
-#     app.run(debug=True, port=5000)  # Ensure the app runs on port 5000
\ No newline at end of file
+from flask import Blueprint, request, jsonify
+
+import interview
+from config import PREDICT_BATCH_MAX_ITEMS
+from disease_fragments import dumps, fragments, json_response
+from metrics import model_inference
+from severity import valid_days
+from model import (check_pattern, calc_condition, vocabulary, predict_batch, rank_diseases, severity_table,
+                   UnknownSymptomsError)
+
+symptoms_bp = Blueprint('symptoms', __name__)
+
+
+def _differential(ranked):
+    return [{"disease": disease, "probability": round(probability, 4)} for disease, probability in ranked]
+
+
+def _diagnosis(symptoms, days):
+    """The prediction part of a diagnosis; fragments.encode adds the per-disease details."""
+    with model_inference('differential'):
+        ranked = rank_diseases([symptoms])[0]
+    severity = calc_condition(symptoms, days)
+    return {
+        "disease": ranked[0][0],
+        "differential": _differential(ranked),
+        "severity": severity,
+        "severity_message": severity['message'],
+    }
+
+
+def _interview_response(cursor, next_symptom):
+    if next_symptom is not None:
+        return jsonify({
+            "done": False,
+            "cursor": cursor,
+            "question": {
+                "symptom": next_symptom,
+                "text": f"Are you experiencing {next_symptom.replace('-', ' ').replace('_', ' ')}?",
+            },
+        })
+    return json_response(fragments.encode({"done": True, "cursor": cursor,
+                                           **_diagnosis(interview.result_symptoms(cursor), cursor['days'])}))
+
+
+@symptoms_bp.route('/match-symptoms', methods=['POST'])
+def match_symptoms():
+    try:
+        data = request.json
+        user_input = data.get('symptom', '')
+        conf, matched_symptoms = check_pattern(vocabulary.names, user_input)
+        return jsonify({
+            "confidence": conf,
+            "matched_symptoms": matched_symptoms
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@symptoms_bp.route('/predict-disease', methods=['POST'])
+def predict_disease():
+    try:
+        data = request.json
+        symptoms = data.get('symptoms', [])
+        days = data.get('days', 0)
+        if not valid_days(days):
+            return jsonify({"error": "days must be a non-negative number"}), 400
+        return json_response(fragments.encode(_diagnosis(symptoms, days)))
+    except UnknownSymptomsError as e:
+        return jsonify({"error": str(e), "unknown_symptoms": e.symptoms}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@symptoms_bp.route('/predict-disease/batch', methods=['POST'])
+def predict_disease_batch():
+    """Predict diseases for many symptom lists in one request.
+
+    Body: {"items": [{"symptoms": [...], "days": 3}, ...]}. Results come back in the same
+    order; an item that can't be predicted gets an "error" entry instead of
+    failing the whole batch.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": 'body must be an object: {"items": [...]}'}), 400
+        items = data.get('items')
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "items must be a non-empty list"}), 400
+        if len(items) > PREDICT_BATCH_MAX_ITEMS:
+            return jsonify({"error": f"At most {PREDICT_BATCH_MAX_ITEMS} items per batch"}), 400
+
+        results = [dumps({"error": "symptoms must be a list"}) for _ in items]
+        symptom_sets, days = [], []
+        for item in items:
+            symptoms = item.get('symptoms') if isinstance(item, dict) else None
+            symptom_sets.append(symptoms if isinstance(symptoms, list) else None)
+            days.append(item.get('days', 0) if isinstance(item, dict) else 0)
+        for i, item_days in enumerate(days):
+            if not valid_days(item_days):
+                symptom_sets[i] = None
+                results[i] = dumps({"error": "days must be a non-negative number"})
+        valid = [i for i, symptoms in enumerate(symptom_sets) if symptoms is not None]
+        with model_inference('batch'):
+            predictions = predict_batch([symptom_sets[i] for i in valid])
+            severities = severity_table.assess([symptom_sets[i] for i in valid], [days[i] for i in valid])
+
+        for i, prediction, severity in zip(valid, predictions, severities):
+            if isinstance(prediction, Exception):
+                results[i] = dumps({"error": str(prediction), "unknown_symptoms": prediction.symptoms})
+                continue
+            disease, confidence = prediction[0]
+            results[i] = fragments.encode({
+                "disease": disease,
+                "confidence": confidence,
+                "differential": _differential(prediction),
+                "severity": severity,
+            })
+        return json_response(b'{"results":[' + b','.join(results) + b']}')
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@symptoms_bp.route('/interview/start', methods=['POST'])
+def interview_start():
+    """Begin a follow-up interview: {"symptom": "skin-rash", "days": 3}.
+
+    Returns the first question and a cursor, which the client sends back
+    unchanged with each answer to /interview/answer.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        cursor, next_symptom = interview.start(data.get('symptom', ''), data.get('days', 0))
+        return _interview_response(cursor, next_symptom)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@symptoms_bp.route('/interview/answer', methods=['POST'])
+def interview_answer():
+    """Answer the pending question: {"cursor": {...}, "answer": "yes" | "no"}.
+
+    Returns the next question, or the diagnosis once the interview is done.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        reply = str(data.get('answer', '')).strip().lower()
+        if reply not in ('yes', 'no'):
+            return jsonify({"error": "answer must be yes or no"}), 400
+        cursor, next_symptom = interview.answer(data.get('cursor'), reply == 'yes')
+        return _interview_response(cursor, next_symptom)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,101 @@
+import cProfile
+import logging
+import os
+import re
+
+from flask import g, request
+
+from config import PROFILING_ENABLED, PROFILER, PROFILE_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+
+
+def _profile_name(request_id):
+    # The request id may come from the client, so keep it filename-safe
+    return re.sub(r'[^A-Za-z0-9_-]', '', request_id)[:64] or 'request'
+
+
+class _CProfileSession:
+    extension = '.prof'
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def save(self, path):
+        self.profiler.dump_stats(path)
+
+
+class _PyinstrumentSession:
+    extension = '.html'
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self.profiler = Profiler()
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write(self.profiler.output_html())
+
+
+def _start_session():
+    if PROFILER == 'pyinstrument':
+        try:
+            return _PyinstrumentSession()
+        except ImportError:
+            logger.warning("PROFILER=pyinstrument but pyinstrument is not installed, using cProfile")
+    return _CProfileSession()
+
+
+def _finish(session):
+    session.stop()
+    path = os.path.join(PROFILE_DIR, _profile_name(g.get('request_id', '')) + session.extension)
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        session.save(path)
+        logger.info(f"Saved profile for {request.path} to {path}")
+        return path
+    except OSError as e:
+        logger.error(f"Could not save profile to {path}: {e}")
+        return None
+
+
+def init_app(app):
+    """Register the opt-in profiling hooks.
+
+    Nothing is registered unless PROFILING_ENABLED is set, so requests pay no
+    cost in normal operation. Must run after timings.init_app, which assigns
+    the request id used to name profiles.
+    """
+    if not PROFILING_ENABLED:
+        return
+
+    @app.before_request
+    def start_profile():
+        if request.headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes'):
+            g.profile_session = _start_session()
+
+    @app.after_request
+    def save_profile(response):
+        session = g.pop('profile_session', None)
+        if session is not None:
+            path = _finish(session)
+            if path:
+                response.headers[PROFILE_HEADER] = os.path.basename(path)
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # after_request is skipped when a view raises; still save what was captured
+        session = g.pop('profile_session', None)
+        if session is not None:
+            _finish(session)
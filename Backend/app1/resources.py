@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from config import HEALTH_TIPS_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceRegistry:
+    """Named shared datasets, each loaded at most once per process.
+
+    Loaders run on first use, or all at once via preload() so a preforking
+    server can load everything in the master before workers are forked.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+
+    def get(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = self._loaders[name]()
+            return self._values[name]
+
+    def override(self, name, value):
+        """Replace a resource's value, e.g. with a fixture dataset in benchmarks."""
+        with self._lock:
+            self._values[name] = value
+
+    def preload(self):
+        for name in self._loaders:
+            self.get(name)
+
+
+registry = ResourceRegistry()
+
+
+def resource(name):
+    """Register the decorated function as the loader for a named resource."""
+    def decorator(loader):
+        registry.register(name, loader)
+        return loader
+    return decorator
+
+
+@resource('medicine_db')
+def load_medication_data():
+    try:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        path_to_csv = os.path.join(script_dir, 'Data', 'Medicine_Details.csv')
+        df = pd.read_csv(path_to_csv)
+        df.columns = df.columns.str.strip()
+        df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+        df = df.fillna('Not specified')
+        logger.info(f"Loaded {len(df)} medication records")
+        return df
+    except Exception as e:
+        logger.error(f"Error loading medication data: {str(e)}")
+        logger.debug(f"Current working directory: {os.getcwd()}")
+        logger.debug(f"Attempted path: {path_to_csv}")
+        return pd.DataFrame(columns=['Medicine Name', 'Composition', 'Uses', 'Side_effects', 'Manufacturer'])
+
+
+@resource('doctor_db')
+def load_doctor_data():
+    try:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        path_to_csv = os.path.join(script_dir, 'Data', 'doctors2.csv')
+        df = pd.read_csv(path_to_csv)
+        logger.info(f"Loaded doctor dataset with {len(df)} records")
+        return df
+    except FileNotFoundError:
+        logger.warning("doctors2.csv not found, using empty DataFrame")
+        return pd.DataFrame(columns=['Name', 'Speciality', 'Email'])
+
+
+@resource('health_tips')
+def load_health_tips():
+    """Pre-generated tips keyed by health_tips.bucket_key; empty until the batch job has run."""
+    try:
+        with open(HEALTH_TIPS_PATH) as f:
+            tips = json.load(f)
+        logger.info(f"Loaded {len(tips)} pre-generated health tips")
+        return tips
+    except FileNotFoundError:
+        logger.info(f"No pre-generated health tips at {HEALTH_TIPS_PATH}, every request goes to the LLM")
+        return {}
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading health tips: {str(e)}")
+        return {}
@@ -0,0 +1,100 @@
+"""Reuse LLM answers for differently worded versions of the same question.
+
+Questions are embedded with a HashingVectorizer (word counts hashed into a
+fixed number of columns, L2-normalized), so there is no vocabulary to fit or
+model to load. Embeddings live in one preallocated float32 matrix used as a
+ring buffer, and a lookup is a matrix-vector product followed by argmax.
+Each worker process has its own cache.
+
+This matches rephrasings that share their content words ("side effects of
+ibuprofen?", "Ibuprofen side effects"), not true paraphrases. The threshold
+is kept high because a near miss would return an answer about another drug.
+Only filler words are dropped. Numbers and words like before, after, more or
+not can turn a question into a different one while barely moving its vector,
+so a hit also needs exactly the same such words as the stored question.
+"""
+import re
+import threading
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from config import (SEMANTIC_CACHE_FEATURES, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD,
+                    SEMANTIC_CACHE_TTL)
+from metrics import record_cache
+
+# Deliberately short: sklearn's English list also drops before/after, more/less,
+# numbers written as words and negations, which turn one question into another
+STOP_WORDS = ['a', 'an', 'the', 'is', 'are', 'am', 'was', 'were', 'be', 'been', 'do', 'does', 'did',
+              'i', 'me', 'my', 'you', 'your', 'it', 'its', 'this', 'that', 'what', 'which',
+              'of', 'to', 'in', 'on', 'and', 'or', 'please', 'tell']
+# Every word, including single characters such as the 2 in "take 2 tablets"
+TOKEN_PATTERN = r'(?u)\b\w+\b'
+_GUARD_TOKEN = re.compile(r'\d+(?:\.\d+)?|[a-z]+')
+# Words that must match exactly for two questions to share an answer
+GUARD_WORDS = {
+    'no', 'not', 'nor', 'never', 'cannot', 'cant', 'dont', 'without', 'none', 'nothing',
+    'before', 'after', 'during', 'while', 'until', 'again', 'first', 'last', 'daily', 'twice',
+    'more', 'less', 'most', 'least', 'few', 'many', 'much', 'max', 'maximum', 'minimum', 'extra',
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten', 'half', 'double',
+    'child', 'children', 'kid', 'kids', 'baby', 'infant', 'pregnant', 'pregnancy', 'breastfeeding',
+}
+
+
+def guard_terms(text):
+    """Numbers and GUARD_WORDS in text, in order."""
+    return [t for t in _GUARD_TOKEN.findall(text.lower().replace("'", '')) if t[0].isdigit() or t in GUARD_WORDS]
+
+
+class SemanticCache:
+    def __init__(self, name, threshold=SEMANTIC_CACHE_THRESHOLD, capacity=SEMANTIC_CACHE_SIZE,
+                 ttl=SEMANTIC_CACHE_TTL, n_features=SEMANTIC_CACHE_FEATURES):
+        self.name = name
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectorizer = HashingVectorizer(n_features=n_features, stop_words=STOP_WORDS,
+                                             token_pattern=TOKEN_PATTERN, alternate_sign=False, norm='l2')
+        self._embeddings = np.zeros((capacity, n_features), dtype=np.float32)
+        self._expires = np.zeros(capacity, dtype=np.float64)  # 0 marks an empty slot
+        self._answers = [None] * capacity
+        self._guards = [None] * capacity
+        self._next = 0
+        self._filled = 0
+        self._lock = threading.Lock()
+
+    def embed(self, text):
+        return self._vectorizer.transform([text]).toarray()[0].astype(np.float32)
+
+    def lookup(self, text):
+        """Return (answer, key): the stored answer to the nearest question, or None.
+
+        Pass key to add() to store the answer for this question.
+        """
+        start = time.perf_counter()
+        embedding = self.embed(text)
+        guards = guard_terms(text)
+        answer = None
+        if embedding.any() and self._filled:
+            with self._lock:
+                # Only the filled rows; the ring buffer fills from slot 0
+                similarity = self._embeddings[:self._filled] @ embedding
+                similarity[self._expires[:self._filled] < time.time()] = -1
+                best = int(similarity.argmax())
+                if similarity[best] >= self.threshold and self._guards[best] == guards:
+                    answer = self._answers[best]
+        record_cache(self.name, answer is not None, time.perf_counter() - start)
+        return answer, (embedding, guards)
+
+    def add(self, key, answer):
+        embedding, guards = key
+        if not embedding.any():
+            return
+        with self._lock:
+            slot = self._next
+            self._embeddings[slot] = embedding
+            self._expires[slot] = time.time() + self.ttl
+            self._answers[slot] = answer
+            self._guards[slot] = guards
+            self._next = (slot + 1) % len(self._answers)
+            self._filled = max(self._filled, slot + 1)
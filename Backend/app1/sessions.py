@@ -0,0 +1,137 @@
+"""Server-side storage for /assistant conversation state.
+
+Sessions are JSON-serializable dicts keyed by an opaque id and expire
+SESSION_TTL seconds after their last write. The backend is picked by
+SESSION_BACKEND: an in-process LRU (default for a single process), a SQLite
+file shared by the workers on one host (default under gunicorn with several
+workers), or Redis (needs the optional redis package).
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import SESSION_BACKEND, SESSION_MAX_ENTRIES, SESSION_REDIS_URL, SESSION_SQLITE_PATH, SESSION_TTL
+
+
+def new_session_id():
+    return secrets.token_urlsafe(16)
+
+
+class MemorySessionStore:
+    def __init__(self, ttl=SESSION_TTL, max_entries=SESSION_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # session id -> (expires at, serialized data)
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if expires < time.monotonic():
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+        # Stored serialized so callers can't mutate shared state, same as the other backends
+        return json.loads(payload)
+
+    def set(self, session_id, data):
+        payload = json.dumps(data)
+        with self._lock:
+            self._entries[session_id] = (time.monotonic() + self.ttl, payload)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+class SQLiteSessionStore:
+    # Expired rows are swept on every Nth write rather than on each one
+    PURGE_EVERY = 100
+
+    def __init__(self, path=SESSION_SQLITE_PATH, ttl=SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions '
+                         '(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)')
+
+    def _connect(self):
+        # One connection per thread and process; sqlite connections can't cross either
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, session_id):
+        row = self._connect().execute(
+            'SELECT data FROM sessions WHERE id = ? AND expires >= ?', (session_id, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, session_id, data):
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)',
+                     (session_id, json.dumps(data), time.time() + self.ttl))
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute('DELETE FROM sessions WHERE expires < ?', (time.time(),))
+
+    def delete(self, session_id):
+        self._connect().execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+
+class RedisSessionStore:
+    KEY_PREFIX = 'docconnect:session:'
+
+    def __init__(self, url=SESSION_REDIS_URL, ttl=SESSION_TTL):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=redis needs the redis package (pip install redis)") from e
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, session_id):
+        payload = self._client.get(self.KEY_PREFIX + session_id)
+        return json.loads(payload) if payload is not None else None
+
+    def set(self, session_id, data):
+        self._client.set(self.KEY_PREFIX + session_id, json.dumps(data), ex=self.ttl)
+
+    def delete(self, session_id):
+        self._client.delete(self.KEY_PREFIX + session_id)
+
+
+BACKENDS = {
+    'memory': MemorySessionStore,
+    'sqlite': SQLiteSessionStore,
+    'redis': RedisSessionStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the process-wide store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if SESSION_BACKEND not in BACKENDS:
+                    raise ValueError(f"Unknown SESSION_BACKEND {SESSION_BACKEND!r}, expected one of {sorted(BACKENDS)}")
+                _store = BACKENDS[SESSION_BACKEND]()
+    return _store
@@ -0,0 +1,71 @@
+"""Symptom severity scoring.
+
+Weights from Symptom_severity.csv are held in a NumPy vector aligned to the
+symptom vocabulary's ids (the model's feature columns), so scoring any number of symptom sets is one
+matrix-vector product. The score is the original calc_condition formula:
+sum of weights * days / (number of symptoms + 1).
+"""
+import csv
+import logging
+import math
+import os
+
+import numpy as np
+
+from vocabulary import symptom_key
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data', 'Symptom_severity.csv')
+# Scores above this get the "see a doctor" level
+CONSULT_THRESHOLD = 13
+
+LEVELS = {
+    'consult_doctor': "You should take the consultation from doctor. ",
+    'take_precautions': "It might not be that bad but you should take precautions.",
+}
+
+
+def load_weights(path=SEVERITY_CSV):
+    weights = {}
+    try:
+        with open(path) as csv_file:
+            for row in csv.reader(csv_file):
+                if len(row) >= 2 and row[1].strip().lstrip('-').isdigit():
+                    weights[symptom_key(row[0])] = int(row[1])
+    except OSError as e:
+        logger.error("Error loading severity weights: %s", e)
+    return weights
+
+
+def valid_days(days):
+    """Whether a request's days is usable in a score: a finite, non-negative JSON number."""
+    return (isinstance(days, (int, float)) and not isinstance(days, bool)
+            and math.isfinite(days) and days >= 0)
+
+
+class SeverityTable:
+    def __init__(self, vocabulary, weights=None):
+        weights = load_weights() if weights is None else weights
+        self.vocabulary = vocabulary
+        self.weights = np.array([weights.get(symptom_key(name), 0) for name in vocabulary.features], dtype=np.float32)
+        missing = [name for name in vocabulary.names if symptom_key(name) not in weights]
+        if missing:
+            logger.warning("No severity weight for %d symptoms: %s", len(missing), missing)
+
+    def scores(self, symptom_sets, days):
+        """Severity score per symptom set; unknown symptoms count towards the set size only."""
+        matrix = np.zeros((len(symptom_sets), len(self.weights)), dtype=np.float32)
+        counts = np.empty(len(symptom_sets), dtype=np.float32)
+        for row, symptoms in enumerate(symptom_sets):
+            matrix[row, self.vocabulary.ids(symptoms)[0]] = 1
+            counts[row] = len(symptoms)
+        return (matrix @ self.weights) * np.asarray(days, dtype=np.float32) / (counts + 1)
+
+    def assess(self, symptom_sets, days):
+        """Structured severity ({"level", "score", "message"}) per symptom set."""
+        results = []
+        for score in self.scores(symptom_sets, days):
+            level = 'consult_doctor' if score > CONSULT_THRESHOLD else 'take_precautions'
+            results.append({'level': level, 'score': round(float(score), 2), 'message': LEVELS[level]})
+        return results
@@ -0,0 +1,65 @@
+import json
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+from metrics import STAGE_LATENCY
+
+# Clients send this header to get a `timings` field back in the JSON response
+TIMINGS_HEADER = 'X-Debug-Timings'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def record(stage_name, seconds):
+    if not has_request_context():
+        return
+    spans = g.get('timing_spans')
+    if spans is not None:
+        spans.append({'stage': stage_name, 'ms': round(seconds * 1000, 3)})
+    STAGE_LATENCY.labels(_route(), stage_name).observe(seconds)
+
+
+@contextmanager
+def stage(stage_name):
+    """Time a block as one stage of the current request's pipeline."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage_name, time.perf_counter() - start)
+
+
+def _wants_timings():
+    return request.headers.get(TIMINGS_HEADER, '').lower() in ('1', 'true', 'yes')
+
+
+def init_app(app):
+    @app.before_request
+    def start_request_timer():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.request_start = time.perf_counter()
+        g.timing_spans = []
+
+    @app.after_request
+    def attach_timings(response):
+        start = g.get('request_start')
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        if _wants_timings() and response.is_json:
+            data = response.get_json(silent=True)
+            if isinstance(data, dict):
+                data['timings'] = {
+                    'request_id': g.request_id,
+                    'total_ms': round(total * 1000, 3),
+                    'stages': g.timing_spans,
+                }
+                response.set_data(json.dumps(data))
+        return response
@@ -0,0 +1,123 @@
+import base64
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Uploads smaller than this stay in memory, anything larger rolls over to disk
+SPOOL_MAX_MEMORY = 1 * 1024 * 1024  # 1MB
+CHUNK_SIZE = 64 * 1024
+# base64 maps every 3 input bytes to 4 output bytes, so chunks must be a multiple of 3
+B64_CHUNK_SIZE = 48 * 1024
+IMAGE_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF', 'BMP', 'TIFF'}
+_INLINE_DATA_PLACEHOLDER = '__inline_data__'
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def ingest_upload(file, max_size):
+    """Copy an uploaded file into a spooled temp file, enforcing max_size while streaming.
+
+    The returned file is positioned at 0; callers own it and should close it.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    stream = getattr(file, 'stream', file)
+    size = 0
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(f"Upload exceeds {max_size} bytes")
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    logger.debug(f"Ingested upload of {size} bytes")
+    return spool
+
+
+def upload_size(fp):
+    pos = fp.tell()
+    fp.seek(0, os.SEEK_END)
+    size = fp.tell()
+    fp.seek(pos)
+    return size
+
+
+def sniff_image_format(fp):
+    """Return the image format from the file header, or None if it isn't a supported image.
+
+    Only the header is parsed; pixel data is not decoded.
+    """
+    try:
+        fp.seek(0)
+        with Image.open(fp) as img:
+            fmt = img.format
+            width, height = img.size
+        if fmt not in IMAGE_FORMATS or not width or not height:
+            logger.error(f"Unsupported image format: {fmt}")
+            return None
+        return fmt
+    except Exception as e:
+        logger.error(f"Image validation failed: {e}")
+        return None
+    finally:
+        fp.seek(0)
+
+
+def iter_base64(fp, chunk_size=B64_CHUNK_SIZE):
+    """Yield base64-encoded chunks of fp without holding the whole encoding in memory."""
+    fp.seek(0)
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        yield base64.b64encode(chunk)
+
+
+def iter_json_with_inline_data(body, fp):
+    """Serialize body as JSON, streaming the base64 of fp wherever the placeholder appears.
+
+    Use `inline_data_placeholder()` as the "data" value of the inline_data part.
+    """
+    encoded = json.dumps(body)
+    marker = json.dumps(_INLINE_DATA_PLACEHOLDER)
+    prefix, suffix = encoded.split(marker, 1)
+    yield (prefix + '"').encode('utf-8')
+    yield from iter_base64(fp)
+    yield ('"' + suffix).encode('utf-8')
+
+
+def inline_data_placeholder():
+    return _INLINE_DATA_PLACEHOLDER
+
+
+@contextmanager
+def spooled_path(spool, suffix=''):
+    """Yield a filesystem path holding the contents of a spooled upload.
+
+    The upload is always copied to a named temp file: a spool that rolled over
+    to disk is an anonymous TemporaryFile with no usable path.
+    """
+    tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    try:
+        spool.seek(0)
+        shutil.copyfileobj(spool, tmp, CHUNK_SIZE)
+        tmp.close()
+        yield tmp.name
+    finally:
+        tmp.close()
+        os.unlink(tmp.name)
+        spool.seek(0)
@@ -0,0 +1,111 @@
+"""Canonical symptom and disease names.
+
+Symptoms are spelled at least four ways across the code and data:
+Training.csv columns (spotting- urination, foul-smell-of urine), the
+severity file (spotting-urination, foul-smell-ofurine), model.dis_list
+(spotting_urination, foul_smell_ofurine), and free text from users
+(spotting urination). All of them reduce to the same key once case,
+spaces, hyphens and underscores are dropped. SymptomVocabulary maps every
+key to one dense id, the model's feature column.
+"""
+import re
+
+_PANDAS_DUP_SUFFIX = re.compile(r'\.\d+$')
+_SEPARATORS = re.compile(r'[\s_-]+')
+
+# Disease names misspelled differently in one of the data files
+DISEASE_ALIASES = {
+    'dimorphic hemorrhoids(piles)': 'dimorphic hemmorhoids(piles)',
+}
+
+
+def symptom_key(name):
+    # pandas suffixes repeated columns (fluid-overload.1)
+    return _SEPARATORS.sub('', _PANDAS_DUP_SUFFIX.sub('', str(name).strip().lower()))
+
+
+def canonical_symptom_name(name):
+    return _SEPARATORS.sub('-', _PANDAS_DUP_SUFFIX.sub('', str(name).strip().lower())).strip('-')
+
+
+def normalize_disease(name):
+    key = ' '.join(str(name).lower().split())
+    return DISEASE_ALIASES.get(key, key)
+
+
+class SymptomVocabulary:
+    """Every spelling of a symptom mapped to its feature column id.
+
+    When two columns reduce to the same key (Training.csv has fluid-overload
+    twice), the one with more positive rows in the training data wins.
+    """
+
+    def __init__(self, features, prevalence=None):
+        self.features = list(features)
+        self._ids = {}
+        for column, feature in enumerate(self.features):
+            key = symptom_key(feature)
+            current = self._ids.get(key)
+            if current is None or (prevalence is not None and prevalence[column] > prevalence[current]):
+                self._ids[key] = column
+        # One canonical (hyphenated) name per distinct symptom, in column order
+        self.names = [canonical_symptom_name(self.features[i]) for i in sorted(self._ids.values())]
+        self._names_by_id = {i: canonical_symptom_name(self.features[i]) for i in self._ids.values()}
+        self._name_keys = {name: symptom_key(name) for name in self.names}
+
+    def __len__(self):
+        return len(self.features)
+
+    def __contains__(self, name):
+        return self.id(name) is not None
+
+    def id(self, name):
+        return self._ids.get(symptom_key(name))
+
+    def ids(self, names):
+        """Return (ids, unknown names) for a list of symptom spellings."""
+        ids, unknown = [], []
+        for name in names:
+            symptom_id = self.id(name)
+            if symptom_id is None:
+                unknown.append(name)
+            else:
+                ids.append(symptom_id)
+        return ids, unknown
+
+    def name(self, symptom_id):
+        return self._names_by_id.get(symptom_id, canonical_symptom_name(self.features[symptom_id]))
+
+    def search(self, text, candidates=None):
+        """Canonical names whose key contains the key of text, e.g. 'skin rash' -> skin-rash."""
+        needle = symptom_key(text)
+        if not needle:
+            return []
+        if candidates is None:
+            return [name for name, key in self._name_keys.items() if needle in key]
+        keys = self._name_keys
+        return [name for name in candidates if needle in (keys.get(name) or symptom_key(name))]
+
+
+class DiseaseDict(dict):
+    """A dict keyed by normalized disease name, so 'Diabetes ' and 'diabetes' find the same entry."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(normalize_disease(key), value)
+
+    def __getitem__(self, key):
+        return super().__getitem__(normalize_disease(key))
+
+    def __contains__(self, key):
+        return super().__contains__(normalize_disease(key))
+
+    def get(self, key, default=None):
+        return super().get(normalize_disease(key), default)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
@@ -0,0 +1,62 @@
+import io
+import shutil
+
+import pytest
+
+ASSISTANT_CONVERSATION = [
+    '', '1', 'paracetamol', 'yes', 'amoxycillin', 'no',
+    '2', 'what are the side effects of ibuprofen?', 'no',
+    '3', '34', 'female', 'improve sleep', 'no',
+]
+
+
+def bench_sec_predict(app, benchmark):
+    from model import sec_predict
+    result = benchmark(sec_predict, ['itching', 'skin-rash', 'nodal-skin-eruptions'])
+    assert result[0] == 'Fungal infection'
+
+
+def bench_check_pattern(app, benchmark):
+    from model import check_pattern, vocabulary
+    dis_list = vocabulary.names
+    conf, matches = benchmark(check_pattern, dis_list, 'pain')
+    assert conf == 1 and matches
+
+
+def bench_search_medications(app, benchmark):
+    from Assist import search_medications
+    results = benchmark(search_medications, 'paracetamol')
+    assert results
+
+
+def bench_get_doctor_recommendations(app, benchmark):
+    from model import get_doctor_recommendations
+    benchmark(get_doctor_recommendations, 'Hepatitis A')
+
+
+@pytest.mark.skipif(shutil.which('tesseract') is None, reason='tesseract is not installed')
+def bench_extract_text_from_image(app, benchmark, report_image):
+    from medic_report import extract_text_from_image
+    text = benchmark(extract_text_from_image, report_image)
+    assert 'Hemoglobin' in text
+
+
+def bench_assistant_conversation(client, benchmark):
+    def converse():
+        context = {}
+        for user_input in ASSISTANT_CONVERSATION:
+            response = client.post('/assistant', json={'input': user_input, 'context': context})
+            context = response.get_json()['context']
+        return context
+
+    context = benchmark(converse)
+    assert context == {'state': 'menu'}
+
+
+def bench_predict_prescription(client, benchmark, prescription_png):
+    def predict():
+        return client.post('/predict', data={'image': (io.BytesIO(prescription_png), 'rx.png')},
+                           content_type='multipart/form-data')
+
+    response = benchmark.pedantic(predict, rounds=5, iterations=1)
+    assert response.get_json()['success']
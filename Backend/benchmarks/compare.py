@@ -0,0 +1,84 @@
+"""Compare a pytest-benchmark JSON run against the stored baseline.
+
+    pytest benchmarks --benchmark-json=current.json
+    python benchmarks/compare.py current.json
+    python benchmarks/compare.py current.json --save-baseline   # accept current.json as the new baseline
+"""
+import argparse
+import json
+import os
+import sys
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+STATS = ('min', 'median', 'mean', 'max')
+
+
+def load_run(path):
+    """Read either a raw pytest-benchmark report or a compact baseline into {name: stats}."""
+    with open(path) as f:
+        data = json.load(f)
+    if 'benchmarks' in data and isinstance(data['benchmarks'], list):
+        return {b['name']: {k: b['stats'][k] for k in STATS} for b in data['benchmarks']}
+    return data['benchmarks']
+
+
+def save_baseline(run, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump({'benchmarks': run}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def format_seconds(value):
+    if value is None:
+        return '-'
+    if value < 1e-3:
+        return f"{value * 1e6:.1f}us"
+    if value < 1:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value:.3f}s"
+
+
+def compare(baseline, current, threshold):
+    rows = []
+    regressions = 0
+    for name in sorted(set(baseline) | set(current)):
+        before = baseline.get(name, {}).get('median')
+        after = current.get(name, {}).get('median')
+        if before and after:
+            change = (after - before) / before * 100
+            status = 'SLOWER' if change > threshold else 'faster' if change < -threshold else 'same'
+            regressions += status == 'SLOWER'
+            delta = f"{change:+.1f}%"
+        else:
+            status = 'new' if after else 'missing'
+            delta = '-'
+        rows.append((name, format_seconds(before), format_seconds(after), delta, status))
+    headers = ('benchmark', 'baseline median', 'current median', 'change', '')
+    widths = [max(len(str(r[i])) for r in rows + [headers]) for i in range(len(headers))]
+    print('  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(str(c).ljust(w) for c, w in zip(row, widths)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('current', help='JSON written by pytest --benchmark-json')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent change in median treated as a real difference (default: 10)')
+    parser.add_argument('--save-baseline', action='store_true', help='store current as the new baseline')
+    args = parser.parse_args(argv)
+
+    current = load_run(args.current)
+    if args.save_baseline:
+        save_baseline(current, args.baseline)
+        print(f"Saved {len(current)} benchmarks to {args.baseline}")
+        return 0
+    regressions = compare(load_run(args.baseline), current, args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+import fixtures
+from fake_upstream import FakeUpstream
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Simulated upstream LLM latency in milliseconds
+UPSTREAM_LATENCY_MS = float(os.environ.get('BENCH_UPSTREAM_LATENCY_MS', 0))
+
+# The backend reads upstream URLs from config at import time, so the fake server
+# has to be up before anything from app1 is imported.
+_upstream = FakeUpstream(latency=UPSTREAM_LATENCY_MS / 1000).start()
+os.environ['MIXTRAL_API_URL'] = _upstream.mistral_url
+os.environ['GEMINI_API_URL'] = _upstream.gemini_url
+sys.path.insert(0, BACKEND_DIR)
+
+
+def synthetic_medicine_db(rows=2000):
+    salts = ['Paracetamol', 'Amoxycillin', 'Ibuprofen', 'Cetirizine', 'Metformin', 'Azithromycin',
+             'Omeprazole', 'Atorvastatin', 'Amlodipine', 'Pantoprazole']
+    records = []
+    for i in range(rows):
+        salt = salts[i % len(salts)]
+        records.append({
+            'Medicine Name': f"{salt[:5]}ex {100 + i % 900} Tablet",
+            'Composition': f"{salt} ({250 + (i % 4) * 125}mg)",
+            'Uses': f"Treatment of condition {i % 50}",
+            'Side_effects': 'Nausea Headache Dizziness',
+            'Manufacturer': f"Pharma {i % 30} Ltd",
+        })
+    return pd.DataFrame(records)
+
+
+@pytest.fixture(scope='session')
+def upstream():
+    yield _upstream
+
+
+@pytest.fixture(scope='session')
+def app(upstream):
+    from app1 import create_app
+    from resources import registry
+    flask_app = create_app()
+    if registry.get('medicine_db').empty:
+        # Medicine_Details.csv isn't checked in; benchmark against a dataset of similar shape
+        registry.override('medicine_db', synthetic_medicine_db())
+    return flask_app
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def report_image():
+    return fixtures.lab_report_image()
+
+
+@pytest.fixture(scope='session')
+def prescription_png():
+    return fixtures.prescription_png()
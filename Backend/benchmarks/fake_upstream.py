@@ -0,0 +1,156 @@
+"""Local stand-in for the Mistral chat-completions and Gemini generateContent APIs.
+
+Point the backend at it with MIXTRAL_API_URL=http://127.0.0.1:<port>/v1/chat/completions
+and GEMINI_API_URL=http://127.0.0.1:<port>/v1beta/models/gemini-2.0-flash:generateContent.
+
+    python benchmarks/fake_upstream.py --port 8900 --latency-ms 800 --jitter-ms 300 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPORT_ANALYSIS = {
+    'predictions': [{'label': 'Iron deficiency anemia', 'confidence': 0.72,
+                     'explanation': 'Low hemoglobin and ferritin'}],
+    'guidance': ['Eat iron-rich foods', 'Follow up with a hematologist'],
+    'primary_condition': 'Hematologist',
+    'summary': 'The report shows mildly low hemoglobin. Iron levels are also low.',
+    'simplified_terms': [{'term': 'Ferritin', 'explanation': 'A protein that stores iron'}],
+}
+
+
+def mistral_reply(payload):
+    prompt = payload['messages'][-1]['content']
+    if 'Analyze the following medical report' in prompt:
+        content = json.dumps(REPORT_ANALYSIS)
+    else:
+        content = "Stay hydrated, rest, and see a doctor if symptoms persist."
+    return {
+        'id': 'fake-chatcmpl',
+        'object': 'chat.completion',
+        'model': payload.get('model', 'mistral-small'),
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4},
+    }
+
+
+def gemini_reply(payload):
+    texts = [part.get('text', '') for part in payload['contents'][0]['parts']]
+    prompt = texts[-1] if texts else ''
+    if 'find the best matching medicine' in prompt:
+        text = '{}'
+    elif 'extract a list of medication names' in prompt:
+        text = 'Panadol\nAugmentin'
+    else:
+        text = 'Panadol 500mg tab bid x 5 days\nAugmentin 625mg tab tid x 7 days'
+    return {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}, 'finishReason': 'STOP'}]}
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b''.join(chunks)
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        payload = json.loads(self._read_body() or b'{}')
+        server = self.server
+        delay = server.latency + (random.uniform(-server.jitter, server.jitter) if server.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        if server.error_rate and random.random() < server.error_rate:
+            # Upstreams fail with a mix of rate limiting and server errors
+            status = random.choice((429, 500, 503))
+            self._send(status, {'error': {'code': status, 'message': 'injected upstream error'}})
+            return
+        if self.path.startswith('/v1/chat/completions'):
+            body = mistral_reply(payload)
+        elif ':generateContent' in self.path:
+            body = gemini_reply(payload)
+        else:
+            self._send(404, {'error': 'not found'})
+            return
+        self._send(200, body)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeUpstream:
+    """Run the fake Mistral/Gemini server on a background thread."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0):
+        """latency and jitter are in seconds; each response waits latency +/- a uniform jitter."""
+        self.server = ThreadingHTTPServer((host, port), FakeUpstreamHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.jitter = jitter
+        self.server.error_rate = error_rate
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def mistral_url(self):
+        return f"{self.base_url}/v1/chat/completions"
+
+    @property
+    def gemini_url(self):
+        return f"{self.base_url}/v1beta/models/gemini-2.0-flash:generateContent"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve fake Mistral and Gemini responses.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with 429/5xx')
+    args = parser.parse_args(argv)
+
+    upstream = FakeUpstream(args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate)
+    print(f"MIXTRAL_API_URL={upstream.mistral_url}")
+    print(f"GEMINI_API_URL={upstream.gemini_url}", flush=True)
+    try:
+        upstream.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        upstream.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import io
+
+from PIL import Image, ImageDraw
+
+LAB_REPORT_LINES = [
+    'CITY DIAGNOSTIC LABORATORY - COMPLETE BLOOD COUNT',
+    'Hemoglobin            10.9 g/dL      (13.0 - 17.0)',
+    'Total Leukocyte Count 7,800 /uL      (4,000 - 11,000)',
+    'Platelet Count        2.1 lakh/uL    (1.5 - 4.1)',
+    'Serum Ferritin        9 ng/mL        (30 - 400)',
+] * 6
+PRESCRIPTION_LINES = ['Rx', 'Panadol 500mg tab bid x 5 days', 'Augmentin 625mg tab tid x 7 days']
+
+
+def render_text_image(lines, size=(1240, 1754)):
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((80, 80 + i * 40), line, fill='black')
+    return image
+
+
+def encode(image, fmt):
+    buf = io.BytesIO()
+    image.save(buf, fmt)
+    return buf.getvalue()
+
+
+def lab_report_image():
+    return render_text_image(LAB_REPORT_LINES)
+
+
+def prescription_png():
+    # Phone-camera resolution, the case the prescription pipeline downscales
+    return encode(render_text_image(PRESCRIPTION_LINES, size=(3024, 4032)), 'PNG')
@@ -0,0 +1,186 @@
+"""Drive scripted traffic at a running backend and report throughput and latency per route.
+
+    python benchmarks/fake_upstream.py --latency-ms 800 --jitter-ms 300 --error-rate 0.01 &
+    MIXTRAL_API_URL=http://127.0.0.1:8900/v1/chat/completions \\
+    GEMINI_API_URL=http://127.0.0.1:8900/v1beta/models/gemini-2.0-flash:generateContent \\
+        gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmarks/loadtest.py --profile mixed --concurrency 16 --duration 60
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+import fixtures
+
+ASSISTANT_SCRIPTS = [
+    ['', '1', 'paracetamol', 'yes', 'ibuprofen', 'no'],
+    ['', '2', 'what are the side effects of ibuprofen?', 'yes', 'can I take it with food?', 'no'],
+    ['', '3', '34', 'female', 'improve sleep', 'no'],
+    ['', '3', '61', 'male', 'lower blood pressure', 'yes', '61', 'male', 'lose weight', 'no'],
+]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, seconds, status, ok):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            self.statuses[route][status] += 1
+            if not ok:
+                self.errors[route] += 1
+
+
+def timed_post(session, recorder, base_url, route, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = session.post(base_url + route, timeout=120, **kwargs)
+    except requests.RequestException as e:
+        recorder.record(route, time.perf_counter() - start, type(e).__name__, False)
+        return None
+    recorder.record(route, time.perf_counter() - start, response.status_code, response.ok)
+    return response
+
+
+def assistant_conversation(session, recorder, base_url, rng, payloads):
+    context = {}
+    for user_input in rng.choice(ASSISTANT_SCRIPTS):
+        response = timed_post(session, recorder, base_url, '/assistant',
+                              json={'input': user_input, 'context': context})
+        if response is None or not response.ok:
+            return
+        context = response.json().get('context', {})
+
+
+def report_upload(session, recorder, base_url, rng, payloads):
+    name, data = rng.choice(payloads['reports'])
+    timed_post(session, recorder, base_url, '/upload', files={'file': (name, data)})
+
+
+def prescription_upload(session, recorder, base_url, rng, payloads):
+    timed_post(session, recorder, base_url, '/predict', files={'image': ('rx.png', payloads['prescription'])})
+
+
+# Scenario weights per traffic profile
+PROFILES = {
+    'assistant': [(1.0, assistant_conversation)],
+    'reports': [(1.0, report_upload)],
+    'prescriptions': [(1.0, prescription_upload)],
+    'mixed': [(0.7, assistant_conversation), (0.2, report_upload), (0.1, prescription_upload)],
+}
+
+
+def build_payloads():
+    report = fixtures.lab_report_image()
+    return {
+        'reports': [('report.png', fixtures.encode(report, 'PNG')), ('report.pdf', fixtures.encode(report, 'PDF'))],
+        'prescription': fixtures.prescription_png(),
+    }
+
+
+def run(base_url, profile, concurrency, duration, seed=0):
+    scenarios = PROFILES[profile]
+    weights = [w for w, _ in scenarios]
+    payloads = build_payloads()
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                scenario = rng.choices([s for _, s in scenarios], weights)[0]
+                scenario(session, recorder, base_url, rng, payloads)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - start
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # Nearest rank: the smallest value with at least pct% of samples at or below it
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed):
+    report = {}
+    all_latencies = []
+    for route in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[route])
+        all_latencies.extend(values)
+        report[route] = _route_stats(values, recorder.errors[route], elapsed)
+        report[route]['statuses'] = {str(k): v for k, v in recorder.statuses[route].items()}
+    report['all'] = _route_stats(sorted(all_latencies), sum(recorder.errors.values()), elapsed)
+    return report
+
+
+def _route_stats(values, errors, elapsed):
+    count = len(values)
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': errors / count if count else 0.0,
+        'throughput_rps': count / elapsed if elapsed else 0.0,
+        'p50_ms': _ms(percentile(values, 50)),
+        'p95_ms': _ms(percentile(values, 95)),
+        'p99_ms': _ms(percentile(values, 99)),
+        'max_ms': _ms(values[-1] if values else None),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def print_report(report, elapsed):
+    headers = ('route', 'requests', 'rps', 'errors', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms')
+    rows = [(route, s['requests'], f"{s['throughput_rps']:.2f}", f"{s['error_rate'] * 100:.1f}%",
+             s['p50_ms'], s['p95_ms'], s['p99_ms'], s['max_ms']) for route, s in report.items()]
+    widths = [max(len(str(r[i])) for r in rows + [headers]) for i in range(len(headers))]
+    print(f"Ran for {elapsed:.1f}s")
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(str(c).ljust(w) for c, w in zip(row, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default='http://127.0.0.1:5000', help='backend base URL')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='mixed')
+    parser.add_argument('--concurrency', type=int, default=8, help='number of simulated clients')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to generate traffic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help='also write the report to this file')
+    args = parser.parse_args(argv)
+
+    recorder, elapsed = run(args.target.rstrip('/'), args.profile, args.concurrency, args.duration, args.seed)
+    report = summarize(recorder, elapsed)
+    print_report(report, elapsed)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'profile': args.profile, 'concurrency': args.concurrency, 'elapsed_s': elapsed,
+                       'routes': report}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Production server settings, e.g. `gunicorn -c gunicorn.conf.py wsgi:app`
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# gthread lets one worker keep serving while other threads wait on slow LLM calls
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# Report and prescription pipelines make several upstream calls of up to 30s each
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+# Each worker writes its Prometheus samples here so /metrics can aggregate across
+# workers. This module is loaded before the app, so the variable is set before
+# prometheus_client is imported; samples from a previous run are discarded.
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'docconnect-metrics'))
+shutil.rmtree(prometheus_dir, ignore_errors=True)
+os.makedirs(prometheus_dir, exist_ok=True)
+
+# The 'memory' session store lives in one worker, so a session_id created there is
+# unknown to the others. With several workers default to the SQLite file they can all
+# open; set SESSION_BACKEND=redis when running more than one container.
+if workers > 1:
+    os.environ.setdefault('SESSION_BACKEND', 'sqlite')
+
+# Each worker lazily starts its own tesserocr pool (OCR_BACKEND=tesserocr) of OCR_WORKERS
+# processes. Split the CPUs between workers rather than giving every worker cpu_count of them.
+os.environ.setdefault('OCR_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+# Load datasets and train/load the model in the master before forking workers
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far into the permanent GC generation. Otherwise the
+    # first collection in each worker touches every object header and un-shares the
+    # copy-on-write pages holding the preloaded data.
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded app state frozen before forking %s %s workers", workers, worker_class)
+    if workers > 1 and os.environ.get('SESSION_BACKEND', '').lower() == 'memory':
+        server.log.warning("SESSION_BACKEND=memory with %s workers: /assistant sessions are per worker "
+                           "and will restart when a turn lands on another one. Use sqlite or redis.", workers)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
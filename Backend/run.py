@@ -1,4 +1,4 @@
-from app1 import app
+from app1 import create_app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    create_app().run(debug=True, port=5000)
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# app1 modules import each other by bare name
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'app1'))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def client():
+    from app1 import create_app
+    return create_app(preload=False).test_client()
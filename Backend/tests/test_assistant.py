@@ -0,0 +1,39 @@
+import pytest
+
+from Assist import MAIN_MENU_TEXT, MENU
+
+
+def turn(client, **body):
+    return client.post('/assistant', json=body)
+
+
+def test_menu_to_tips_age(client):
+    response = turn(client, input='3', context={'state': MENU})
+    assert response.status_code == 200
+    assert response.get_json()['context']['state'] == 'tips_age'
+
+
+@pytest.mark.parametrize('context', [
+    {'state': ['a']},
+    {'state': {'a': 1}},
+    {'state': 'no_such_state'},
+    {'state': 'tips_goals', 'health_info': 'str'},
+    {'state': 'tips_goals', 'health_info': [1]},
+    {'current_flow': 'health_tips', 'health_info': 5},
+])
+def test_invalid_context_restarts_at_menu(client, context):
+    response = turn(client, input='improve sleep', context=context)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['context'] == {'state': MENU}
+    assert MAIN_MENU_TEXT in body['response']
+
+
+@pytest.mark.parametrize('body', [{'input': 3}, {'input': None}, {'input': ['1']}, {'input': '1', 'session_id': 5}])
+def test_invalid_fields_are_rejected(client, body):
+    assert turn(client, **body).status_code == 400
+
+
+def test_non_object_body_is_rejected(client):
+    response = client.post('/assistant', data='["1"]', content_type='application/json')
+    assert response.status_code == 400
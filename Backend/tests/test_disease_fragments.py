@@ -0,0 +1,18 @@
+import json
+
+import pytest
+
+
+def test_encode_splices_static_members(client):
+    from disease_fragments import fragments
+    body = json.loads(fragments.encode({'disease': 'Fungal infection', 'severity': {'score': 6.0}}))
+    assert body['severity'] == {'score': 6.0}
+    assert body['precautions'][0] == 'bath twice'
+    assert 'description' in body and 'doctor_recommendations' in body
+
+
+@pytest.mark.parametrize('score', [float('nan'), float('inf')])
+def test_encode_rejects_non_finite_numbers(client, score):
+    from disease_fragments import fragments
+    with pytest.raises(ValueError):
+        fragments.encode({'disease': 'Fungal infection', 'severity': {'score': score}})
@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def cursor(client):
+    response = client.post('/interview/start', json={'symptom': 'itching', 'days': 3})
+    assert response.status_code == 200
+    return response.get_json()['cursor']
+
+
+def test_interview_runs_to_a_diagnosis(client, cursor):
+    body = {'done': False, 'cursor': cursor}
+    for _ in range(50):
+        response = client.post('/interview/answer', json={'cursor': body['cursor'], 'answer': 'yes'})
+        assert response.status_code == 200
+        body = response.get_json()
+        if body['done']:
+            break
+    assert body['done'] and body['disease']
+
+
+@pytest.mark.parametrize('change', [
+    {'node': True}, {'present': [True]}, {'absent': [False]},
+    {'days': None}, {'days': [1]}, {'days': 'abc'}, {'days': -2},
+])
+def test_answer_rejects_tampered_cursor(client, cursor, change):
+    response = client.post('/interview/answer', json={'cursor': {**cursor, **change}, 'answer': 'yes'})
+    assert response.status_code == 400
+    assert 'cursor' in response.get_json()['error'] or 'days' in response.get_json()['error']
+
+
+def test_start_rejects_infinite_days(client):
+    response = client.post('/interview/start', data='{"symptom": "itching", "days": Infinity}',
+                           content_type='application/json')
+    assert response.status_code == 400
@@ -0,0 +1,28 @@
+import pytest
+
+
+def test_batch_mixes_results_and_errors(client):
+    response = client.post('/predict-disease/batch', json={'items': [
+        {'symptoms': ['itching', 'skin-rash'], 'days': 2},
+        {'symptoms': 'itching'},
+        {'symptoms': ['bogus']},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results[0]['disease'] == 'Fungal infection'
+    assert 'error' in results[1]
+    assert results[2]['unknown_symptoms'] == ['bogus']
+
+
+@pytest.mark.parametrize('body', ['[{"symptoms": ["itching"]}]', '"items"', 'null'])
+def test_batch_rejects_non_object_body(client, body):
+    response = client.post('/predict-disease/batch', data=body, content_type='application/json')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('days', ['NaN', 'Infinity', '-1', 'null', 'true'])
+def test_batch_rejects_invalid_days(client, days):
+    body = '{"items": [{"symptoms": ["itching"], "days": %s}]}' % days
+    response = client.post('/predict-disease/batch', data=body, content_type='application/json')
+    assert response.status_code == 200
+    assert 'days' in response.get_json()['results'][0]['error']
@@ -0,0 +1,25 @@
+import pytest
+
+SYMPTOMS = ['itching', 'skin-rash', 'nodal-skin-eruptions']
+
+
+def test_predict_disease(client):
+    response = client.post('/predict-disease', json={'symptoms': SYMPTOMS, 'days': 3})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['disease'] == 'Fungal infection'
+    assert body['severity']['score'] == 6.0
+
+
+@pytest.mark.parametrize('days', [None, 'abc', '3', True, -1, [3]])
+def test_predict_disease_rejects_invalid_days(client, days):
+    response = client.post('/predict-disease', json={'symptoms': SYMPTOMS, 'days': days})
+    assert response.status_code == 400
+    assert 'days' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('days', ['NaN', 'Infinity'])
+def test_predict_disease_rejects_non_finite_days(client, days):
+    body = '{"symptoms": ["itching"], "days": %s}' % days
+    response = client.post('/predict-disease', data=body, content_type='application/json')
+    assert response.status_code == 400
@@ -0,0 +1,42 @@
+import pytest
+
+from semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache('test', capacity=16)
+
+
+def remember(cache, question, answer):
+    hit, key = cache.lookup(question)
+    assert hit is None
+    cache.add(key, answer)
+
+
+def test_rephrased_question_hits(cache):
+    remember(cache, "What are the side effects of ibuprofen?", "ibuprofen answer")
+    assert cache.lookup("Ibuprofen side effects?")[0] == "ibuprofen answer"
+
+
+@pytest.mark.parametrize('first, second', [
+    ("can I take 2 tablets before food", "can I take 8 tablets after food"),
+    ("can I take 2 tablets before food", "can I take 8 tablets before food"),
+    ("can I take 2 tablets before food", "can I take 2 tablets after food"),
+    ("should I take ibuprofen during pregnancy", "should I not take ibuprofen during pregnancy"),
+    ("is it safe to take more paracetamol", "is it safe to take less paracetamol"),
+])
+def test_medically_different_questions_miss(cache, first, second):
+    remember(cache, first, "first answer")
+    assert cache.lookup(second)[0] is None
+
+
+def test_expired_entries_miss(cache):
+    cache.ttl = -1
+    remember(cache, "side effects of ibuprofen", "stale")
+    assert cache.lookup("side effects of ibuprofen")[0] is None
+
+
+def test_guard_terms():
+    from semantic_cache import guard_terms
+    assert guard_terms("Can I take 2.5 tablets before food? Don't exceed 8") == ['2.5', 'before', 'dont', '8']
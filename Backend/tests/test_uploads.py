@@ -0,0 +1,25 @@
+import io
+import os
+
+import pytest
+
+from uploads import SPOOL_MAX_MEMORY, UploadTooLarge, ingest_upload, spooled_path
+
+
+@pytest.mark.parametrize('size', [1000, SPOOL_MAX_MEMORY * 3])
+def test_spooled_path_copies_upload(size):
+    data = os.urandom(size)
+    spool = ingest_upload(io.BytesIO(data), max_size=size)
+    assert spool._rolled == (size > SPOOL_MAX_MEMORY)
+    with spooled_path(spool, suffix='.pdf') as path:
+        assert path.endswith('.pdf')
+        with open(path, 'rb') as f:
+            assert f.read() == data
+    assert not os.path.exists(path)
+    assert spool.tell() == 0
+    spool.close()
+
+
+def test_ingest_upload_enforces_max_size():
+    with pytest.raises(UploadTooLarge):
+        ingest_upload(io.BytesIO(b'x' * 11), max_size=10)
@@ -0,0 +1,6 @@
+from app1 import create_app
+
+# Building the app loads MEDICINE_DB, DOCTOR_DB, the trained classifier and the
+# symptom lookup dictionaries. With gunicorn's preload_app this runs once in the
+# master, and forked workers share those pages copy-on-write.
+app = create_app()
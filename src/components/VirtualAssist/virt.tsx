@@ -9,6 +9,8 @@ interface Message {
 }
 
 interface Context {
+  state?: string;
+  health_info?: { age?: string; gender?: string; goals?: string };
   awaiting_option?: boolean;
   option_selected?: string | null;
   awaiting_medication_continue?: boolean;